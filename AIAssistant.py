@@ -1,19 +1,123 @@
-import openai
+import functools
+import json
+import time
 
 
 from datetime import datetime
+from AIResilience import AIResilience, CircuitOpenError
+from AITransport import AITransport
+from HandlerProfiler import profiled
+from LocalSuggestionEngine import LocalSuggestionEngine
+from PromptBuilder import PromptBuilder
+from ProviderRouter import ProviderRouter
+from RequestCoalescer import RequestCancelledError, RequestCoalescer
+from SuggestionHistory import SuggestionHistory
+from UsageTracker import UsageTracker
 
 
 class AIAssistant:
+    DEFAULT_MODELS = {"gemini": "gemini-2.0-flash", "openai": "gpt-3.5-turbo"}
+
     def __init__(self):
         self.client = None
         self.api_key = ""
         self.is_api_key_valid = False
-        self.ai_suggestions = []
+        self.ai_suggestions = SuggestionHistory()
         self.model_type = "gemini"  # "openai" or "gemini"
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
         self.current_model = "gpt-3.5-turbo"  # Default model
+        self.transport = AITransport()
+        self.resilience = AIResilience()
+        # Requests go to the fastest healthy provider: the validated key
+        # ("primary") plus any extra providers from the settings file, given
+        # as {"name", "model", "api_key", "base_url"}
+        self.router = ProviderRouter()
+        self.extra_providers = []
+        self.hedge_break_suggestions = False  # Opt in: hedging costs extra tokens
+        self.coalescer = RequestCoalescer()
+        self.usage = UsageTracker()
+        self.local_engine = LocalSuggestionEngine()
+        self.prompt_builder = PromptBuilder()
+        self.report_cache = None  # (stats snapshot, report)
+        self.report_suggestion_used = True
+
+    def _create_completion(
+        self,
+        method,
+        messages,
+        max_tokens,
+        max_retries=None,
+        generation=None,
+        response_format=None,
+        hedge=False,
+        provider=None,
+        enforce_budget=True,
+    ):
+        # Identical prompts already in flight share a single request
+        key = (
+            self.current_model,
+            max_tokens,
+            tuple((m["role"], m["content"]) for m in messages),
+        )
+
+        extra_args = {}
+        if response_format:
+            extra_args["response_format"] = response_format
+
+        def send():
+            prompt_tokens = sum(
+                self.prompt_builder.estimate_tokens(m["content"]) for m in messages
+            )
+            if enforce_budget:
+                self.usage.check_budget(prompt_tokens + max_tokens)
+            self.usage.record_estimate(method, prompt_tokens)
+
+            if provider:
+                call = functools.partial(self.router.call_provider, provider)
+            elif hedge and self.hedge_break_suggestions:
+                call = functools.partial(
+                    self.router.call_hedged,
+                    record_extra=lambda response, latency: self.usage.record_call(
+                        method, latency, getattr(response, "usage", None)
+                    ),
+                )
+            else:
+                call = self.router.call
+
+            start = time.perf_counter()
+            try:
+                response = call(
+                    max_retries=max_retries,
+                    before_attempt=lambda: self.coalescer.check_current(generation),
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    **extra_args,
+                )
+            except RequestCancelledError:
+                raise
+            except Exception:
+                self.usage.record_error(method, time.perf_counter() - start)
+                raise
+
+            self.usage.record_call(
+                method, time.perf_counter() - start, getattr(response, "usage", None)
+            )
+            return response
+
+        response, shared = self.coalescer.run(key, send, generation)
+        if shared:
+            self.usage.record_cache_hit(method)
+        return response
+
+    def _stats_snapshot(self, stats, current_task):
+        return (
+            stats["focus_time"],
+            stats["pomodoros_completed"],
+            stats["tasks_completed"],
+            current_task,
+        )
 
+    @profiled("AIAssistant.validate_api_key")
     def validate_api_key(self, key, model_type="openai", base_url=None):
         if not key:
             return False, "API Key Required"
@@ -22,22 +126,25 @@ class AIAssistant:
         self.model_type = model_type
         self.base_url = base_url
         # Set the model based on model_type
-        self.current_model = (
-            "gemini-2.0-flash" if self.model_type == "gemini" else "gpt-3.5-turbo"
-        )
+        self.current_model = self.DEFAULT_MODELS.get(self.model_type, "gpt-3.5-turbo")
+
+        # A new key or endpoint starts with a clean health record
+        self.resilience.breaker.reset()
 
         try:
-            # Initialize OpenAI client with the provided key
+            # Clients for every key and endpoint share one connection pool
             if self.model_type == "gemini" and self.base_url:
-                self.client = openai.OpenAI(
-                    api_key=self.api_key, base_url=self.base_url
-                )
+                self.client = self.transport.get_client(self.api_key, self.base_url)
             else:
-                self.client = openai.OpenAI(api_key=self.api_key)
+                self.client = self.transport.get_client(self.api_key)
+            primary = self.router.set_provider(
+                "primary", self.current_model, self.client, self.resilience
+            )
+            self.configure_providers()
 
             # Simple test call to validate the API key
-            response = self.client.chat.completions.create(
-                model=self.current_model,
+            response = self._create_completion(
+                "validate_api_key",
                 messages=[
                     {
                         "role": "user",
@@ -45,6 +152,10 @@ class AIAssistant:
                     }
                 ],
                 max_tokens=10,
+                max_retries=0,
+                provider=primary,
+                # A spent budget says nothing about whether the key works
+                enforce_budget=False,
             )
 
             if "API key is valid" in response.choices[0].message.content:
@@ -58,10 +169,42 @@ class AIAssistant:
             self.is_api_key_valid = False
             return False, f"Error validating API key: {str(e)}"
 
-    def get_productivity_suggestion(self, current_task, stats):
+    def configure_providers(self):
+        configured = {"primary"}
+        for config in self.extra_providers:
+            try:
+                client = self.transport.get_client(
+                    config["api_key"], config.get("base_url")
+                )
+                self.router.set_provider(config["name"], config["model"], client)
+                configured.add(config["name"])
+            except Exception as e:
+                print(f"Error configuring AI provider: {str(e)}")
+
+        for provider in self.router.get_ranked():
+            if provider.name not in configured:
+                self.router.remove_provider(provider.name)
+
+    @profiled("AIAssistant.get_productivity_suggestion")
+    def get_productivity_suggestion(self, current_task, stats, generation=None):
         if not self.is_api_key_valid:
             return None, "API key not validated"
 
+        # A fresh batched report already carries a tip for this exact state
+        if (
+            self.report_cache
+            and not self.report_suggestion_used
+            and self.report_cache[0][0] == self._stats_snapshot(stats, current_task)
+            and self.report_cache[1]["suggestion"]
+        ):
+            self.report_suggestion_used = True
+            self.usage.record_cache_hit("get_productivity_suggestion")
+            suggestion = self.report_cache[1]["suggestion"]
+            self.ai_suggestions.append(
+                datetime.now().strftime("%Y-%m-%d %H:%M"), suggestion
+            )
+            return suggestion, None
+
         try:
             prompt = f"""You are a productivity assistant in a timer app. 
             The user is currently working on: "{current_task if current_task else 'an unknown task'}".
@@ -72,25 +215,29 @@ class AIAssistant:
             Be encouraging but not overly enthusiastic. Sound like a knowledgeable productivity coach.
             """
 
-            response = self.client.chat.completions.create(
-                model=self.current_model,
+            response = self._create_completion(
+                "get_productivity_suggestion",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=150,
+                generation=generation,
             )
 
             suggestion = response.choices[0].message.content.strip()
 
             # Add to suggestions list
             self.ai_suggestions.append(
-                {"time": datetime.now().strftime("%H:%M"), "suggestion": suggestion}
+                datetime.now().strftime("%Y-%m-%d %H:%M"), suggestion
             )
 
             return suggestion, None
 
+        except CircuitOpenError:
+            return self.local_engine.get_productivity_tip(stats), None
         except Exception as e:
             return None, f"Error getting AI suggestion: {str(e)}"
 
-    def get_break_suggestion(self, focus_time):
+    @profiled("AIAssistant.get_break_suggestion")
+    def get_break_suggestion(self, focus_time, generation=None):
         if not self.is_api_key_valid:
             return None, "API key not validated"
 
@@ -103,24 +250,51 @@ class AIAssistant:
             Keep your response concise (under 100 words) and make the suggestion specific.
             """
 
-            response = self.client.chat.completions.create(
-                model=self.current_model,
+            response = self._create_completion(
+                "get_break_suggestion",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=150,
+                generation=generation,
+                hedge=True,
             )
 
             suggestion = response.choices[0].message.content.strip()
             return suggestion, None
 
+        except CircuitOpenError:
+            return self.local_engine.get_break_activity(focus_time), None
         except Exception as e:
             return None, f"Error getting break suggestion: {str(e)}"
 
-    def analyze_productivity(self, stats, current_task, tasks):
+    @profiled("AIAssistant.get_productivity_report")
+    def get_productivity_report(
+        self,
+        stats,
+        current_task,
+        tasks,
+        generation=None,
+        history_summary="",
+        task_details=None,
+        tasks_version=None,
+    ):
         if not self.is_api_key_valid:
             return None, "API key not validated"
 
+        # One report serves every view of the same stats snapshot
+        snapshot = (
+            self._stats_snapshot(stats, current_task),
+            tuple(tasks) if tasks_version is None else tasks_version,
+            history_summary,
+        )
+        if self.report_cache and self.report_cache[0] == snapshot:
+            self.usage.record_cache_hit("get_productivity_report")
+            return self.report_cache[1], None
+
         try:
-            task_text = "\n".join([f"- {task}" for task in tasks])
+            # Large backlogs are ranked and cut to the prompt budget
+            task_text, _ = self.prompt_builder.build_task_text(
+                tasks, current_task, task_details, tasks_version
+            )
 
             prompt = f"""You are a productivity assistant in a timer app. 
             Analyze the user's current productivity based on this data:
@@ -134,22 +308,75 @@ class AIAssistant:
             Task list:
             {task_text if task_text else "No tasks added yet."}
             
-            Provide a brief analysis of their productivity patterns and one specific suggestion to improve.
-            Keep your response to about 150 words. Be insightful but practical.
+            Longer-term history:
+            {history_summary if history_summary else "No history yet."}
+            
+            Respond with a JSON object with exactly these string fields:
+            - "suggestion": a short, actionable productivity tip for their current task (under 120 words).
+            - "analysis": a brief analysis of their productivity patterns and one specific suggestion to improve (about 150 words).
+            - "insights": data-driven insights and 2-3 specific strategies based on these numbers. If they've spent
+              significant time but completed few tasks, suggest ways to break down work. If they've completed many
+              short sessions, suggest longer focus periods.
+            
+            Be specific, actionable, and encouraging. Output only the JSON object.
             """
 
-            response = self.client.chat.completions.create(
-                model=self.current_model,
+            response = self._create_completion(
+                "get_productivity_report",
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
+                max_tokens=700,
+                generation=generation,
+                response_format={"type": "json_object"},
             )
 
-            analysis = response.choices[0].message.content.strip()
-            return analysis, None
+            content = response.choices[0].message.content.strip()
+            # Some models wrap JSON output in a markdown code fence
+            if content.startswith("```"):
+                content = content.strip("`").removeprefix("json").strip()
+
+            data = json.loads(content)
+            report = {
+                key: str(data.get(key) or "").strip()
+                for key in ("suggestion", "analysis", "insights")
+            }
+            # A partial report would be cached and shown as blank text
+            missing = [key for key, value in report.items() if not value]
+            if missing:
+                raise ValueError(f"response is missing {', '.join(missing)}")
+
+            self.report_cache = (snapshot, report)
+            self.report_suggestion_used = False
+            return report, None
 
         except Exception as e:
-            return None, f"Error analyzing productivity: {str(e)}"
+            return None, f"Error getting productivity report: {str(e)}"
+
+    @profiled("AIAssistant.analyze_productivity")
+    def analyze_productivity(
+        self,
+        stats,
+        current_task,
+        tasks,
+        generation=None,
+        history_summary="",
+        task_details=None,
+        tasks_version=None,
+    ):
+        report, error = self.get_productivity_report(
+            stats,
+            current_task,
+            tasks,
+            generation,
+            history_summary,
+            task_details,
+            tasks_version,
+        )
+        if error:
+            return None, error
 
+        return report["analysis"], None
+
+    @profiled("AIAssistant.generate_tasks")
     def generate_tasks(self, context):
         if not self.is_api_key_valid:
             return None, "API key not validated"
@@ -170,8 +397,8 @@ class AIAssistant:
             Format the tasks as a simple list with no explanations or additional text.
             """
 
-            response = self.client.chat.completions.create(
-                model=self.current_model,
+            response = self._create_completion(
+                "generate_tasks",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=250,
             )
@@ -202,51 +429,50 @@ class AIAssistant:
         except Exception as e:
             return None, f"Error generating tasks: {str(e)}"
 
-    def get_productivity_insights(self, stats):
-        if not self.is_api_key_valid:
-            return None, "API key not validated"
-
-        try:
-            prompt = f"""You are a productivity assistant in a timer app. 
-            Analyze the user's productivity stats:
-            
-            - Focus time today: {stats['focus_time']} minutes
-            - Pomodoros completed: {stats['pomodoros_completed']}
-            - Tasks completed: {stats['tasks_completed']}
-            
-            Provide data-driven insights about their productivity patterns and suggest
-            2-3 specific strategies to improve their productivity based on these numbers.
-            
-            If they've spent significant time but completed few tasks, suggest ways to break down work.
-            If they've completed many short sessions, suggest longer focus periods.
-            
-            Be specific, actionable, and encouraging.
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.current_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-            )
-
-            insights = response.choices[0].message.content.strip()
-            return insights, None
+    @profiled("AIAssistant.get_productivity_insights")
+    def get_productivity_insights(
+        self,
+        stats,
+        current_task="",
+        tasks=(),
+        generation=None,
+        history_summary="",
+        task_details=None,
+        tasks_version=None,
+    ):
+        report, error = self.get_productivity_report(
+            stats,
+            current_task,
+            tasks,
+            generation,
+            history_summary,
+            task_details,
+            tasks_version,
+        )
+        if error:
+            return None, error
 
-        except Exception as e:
-            return None, f"Error getting AI insights: {str(e)}"
+        return report["insights"], None
 
     def get_settings_dict(self):
-        return {
+        settings = {
             "api_key": self.api_key,
             "model_type": self.model_type,
             "base_url": self.base_url,
+            "prompt_task_budget": self.prompt_builder.task_token_budget,
+            "ai_providers": self.extra_providers,
+            "hedge_break_suggestions": self.hedge_break_suggestions,
         }
+        settings.update(self.usage.get_settings_dict())
+        return settings
 
     def load_from_settings(self, settings):
         self.api_key = settings.get("api_key", "")
         self.model_type = settings.get("model_type", "openai")
         self.base_url = settings.get("base_url", None)
+        self.prompt_builder.task_token_budget = settings.get("prompt_task_budget", 400)
+        self.extra_providers = settings.get("ai_providers", [])
+        self.hedge_break_suggestions = settings.get("hedge_break_suggestions", False)
+        self.usage.load_from_settings(settings)
         # Update current_model when loading settings
-        self.current_model = (
-            "gemini-pro" if self.model_type == "gemini" else "gpt-3.5-turbo"
-        )
+        self.current_model = self.DEFAULT_MODELS.get(self.model_type, "gpt-3.5-turbo")
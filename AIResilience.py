@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+
+import openai
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"  # "closed", "open" or "half_open"
+        self.failure_count = 0
+        self.open_until = 0.0  # Monotonic time when a probe may go through
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() < self.open_until:
+                    return False
+                # Let a single probe through to test the backend
+                self.state = "half_open"
+                return True
+
+            if self.state == "half_open":
+                # A probe is already in flight
+                return False
+
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failure_count = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            if (
+                self.state == "half_open"
+                or self.failure_count >= self.failure_threshold
+            ):
+                self.state = "open"
+                self.open_until = time.monotonic() + self.reset_timeout
+
+    def hold_open(self, seconds):
+        # The server asked for no requests for this long
+        with self._lock:
+            self.state = "open"
+            self.open_until = max(self.open_until, time.monotonic() + seconds)
+
+    def release_probe(self):
+        # A probe that never reached the backend frees its slot
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def seconds_until_retry(self):
+        if self.state != "open":
+            return 0
+        return max(0, int(self.open_until - time.monotonic()))
+
+    def reset(self):
+        with self._lock:
+            self.state = "closed"
+            self.failure_count = 0
+            self.open_until = 0.0
+
+
+class AIResilience:
+    RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        timeout=15.0,
+        deadline=30.0,
+        max_retries=2,
+        base_delay=0.5,
+        max_delay=8.0,
+    ):
+        self.timeout = timeout  # Per-attempt timeout in seconds
+        self.deadline = deadline  # Total budget for a call including retries
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker()
+
+    def call(self, func, max_retries=None, before_attempt=None, **kwargs):
+        if before_attempt:
+            # Lets the caller abandon a request that is no longer wanted. The
+            # first check runs before a half-open probe slot is taken.
+            before_attempt()
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(
+                f"AI service unavailable, retrying in {self.breaker.seconds_until_retry()}s"
+            )
+
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        settled = False  # Whether the breaker has heard how the call went
+
+        try:
+            while True:
+                if before_attempt and attempt:
+                    before_attempt()
+
+                remaining = deadline - time.monotonic()
+                try:
+                    response = func(timeout=min(self.timeout, remaining), **kwargs)
+                except Exception as e:
+                    if not self.is_retryable(e):
+                        # Client-side errors (bad key, bad request) still mean
+                        # the backend answered, so it counts as healthy
+                        self.breaker.record_success()
+                        settled = True
+                        raise
+
+                    delay = self.get_retry_delay(e, attempt)
+                    if (
+                        attempt >= max_retries
+                        or self.breaker.state == "open"
+                        or time.monotonic() + delay >= deadline
+                    ):
+                        # One failure per call once its retries are used up,
+                        # so a single flaky call cannot open the circuit
+                        self.breaker.record_failure()
+                        settled = True
+                        if self.get_retry_after(e) is not None:
+                            # Nobody should call before the server's time
+                            self.breaker.hold_open(delay)
+                        raise
+
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+
+                self.breaker.record_success()
+                settled = True
+                return response
+        finally:
+            if not settled:
+                # Interrupted before any attempt completed
+                self.breaker.release_probe()
+
+    def is_retryable(self, error):
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        status_code = getattr(error, "status_code", None)
+        return status_code in self.RETRYABLE_STATUS_CODES
+
+    def get_retry_after(self, error):
+        # The server's Retry-After hint in seconds, if it sent one
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+
+        retry_after = response.headers.get("retry-after")
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return None
+
+    def get_retry_delay(self, error, attempt):
+        # Honor the server's Retry-After hint on rate limiting in full
+        retry_after = self.get_retry_after(error)
+        if retry_after is not None:
+            return retry_after
+
+        # Exponential backoff with full jitter
+        delay = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, delay)
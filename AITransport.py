@@ -0,0 +1,56 @@
+import threading
+
+import httpx
+import openai
+
+try:
+    import h2  # HTTP/2 support for httpx is optional
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AITransport:
+    # One pooled HTTP client shared by every provider client, so switching
+    # keys, models or providers keeps warm connections instead of opening
+    # new ones with a fresh TLS handshake
+    def __init__(self, max_connections=10, max_keepalive_connections=5, keepalive_expiry=300):
+        # AI calls come minutes apart, so idle connections are kept much
+        # longer than the httpx default of 5 seconds
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http_client = None
+        self.clients = {}  # base_url -> openai.OpenAI
+        self._lock = threading.Lock()
+
+    def get_http_client(self):
+        if self.http_client is None or self.http_client.is_closed:
+            self.http_client = openai.DefaultHttpxClient(
+                http2=HTTP2_AVAILABLE, limits=self.limits
+            )
+        return self.http_client
+
+    def get_client(self, api_key, base_url=None):
+        # Retries are handled by the resilience layer, not by the client
+        with self._lock:
+            client = self.clients.get(base_url)
+            if client is None or client.api_key != api_key:
+                client = openai.OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=0,
+                    http_client=self.get_http_client(),
+                )
+                self.clients[base_url] = client
+            return client
+
+    def close(self):
+        with self._lock:
+            self.clients = {}
+            if self.http_client is not None:
+                self.http_client.close()
+                self.http_client = None
@@ -0,0 +1,101 @@
+from datetime import date, datetime
+
+import numpy as np
+
+
+class ChartData:
+    # Running totals behind the statistics charts. They are built once from
+    # the archive and recent history, then extended one session at a time.
+    def __init__(self, stats_manager, archive=None):
+        self.stats_manager = stats_manager
+        self.archive = archive
+        self.daily_focus = {}  # date ordinal -> focus minutes
+        self.task_minutes = {}  # task -> focus minutes
+        self.source = None
+        self.extracted = 0
+        self.archive_totals = None  # (archive rows, daily focus, task minutes)
+
+    def get_archive_totals(self):
+        # Archived sessions never change, so their totals are only
+        # recomputed after compaction adds rows
+        if self.archive_totals and self.archive_totals[0] == self.archive.rows:
+            return self.archive_totals[1], self.archive_totals[2]
+
+        columns = self.archive.columns
+        done = (columns["mode"] == 0) & (columns["completed"] == 1)
+        minutes = columns["minutes"][done].astype(np.float64)
+        started = columns["ended_at"][done] - minutes * 60
+
+        # Local day of each session start, using the current UTC offset
+        offset = datetime.now().astimezone().utcoffset().total_seconds()
+        days = np.floor_divide(started + offset, 86400).astype(np.int64)
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        day_minutes = np.bincount(day_index, weights=minutes)
+        epoch = date(1970, 1, 1).toordinal()
+        daily_focus = {
+            epoch + day: total
+            for day, total in zip(unique_days.tolist(), day_minutes.tolist())
+        }
+
+        totals = np.bincount(columns["task_id"][done], weights=minutes)
+        task_minutes = {
+            self.archive.task_names[task_id]: float(totals[task_id])
+            for task_id in np.flatnonzero(totals).tolist()
+        }
+
+        self.archive_totals = (self.archive.rows, daily_focus, task_minutes)
+        return daily_focus, task_minutes
+
+    def rebuild(self):
+        self.daily_focus = {}
+        self.task_minutes = {}
+        if self.archive is not None and self.archive.rows:
+            daily_focus, task_minutes = self.get_archive_totals()
+            self.daily_focus = dict(daily_focus)
+            self.task_minutes = dict(task_minutes)
+
+        self.source = self.stats_manager.session_history
+        self.extracted = 0
+        self.add_records(self.source)
+        self.extracted = len(self.source)
+
+    def add_records(self, records):
+        changed_days = set()
+        for ended_at, minutes, mode, task, completed in records:
+            if mode != "Work" or not completed:
+                continue
+            day = date.fromtimestamp(ended_at - minutes * 60).toordinal()
+            self.daily_focus[day] = self.daily_focus.get(day, 0) + minutes
+            self.task_minutes[task] = self.task_minutes.get(task, 0) + minutes
+            changed_days.add(day)
+        return changed_days
+
+    def update(self):
+        # Returns the days whose totals changed, or None after a full rebuild
+        history = self.stats_manager.session_history
+        if history is not self.source or len(history) < self.extracted:
+            # First use, or the history was compacted into the archive
+            self.rebuild()
+            return None
+
+        changed_days = self.add_records(history[self.extracted :])
+        self.extracted = len(history)
+        return changed_days
+
+    def get_streak(self, today=None):
+        # Consecutive days with focus time, ending today or yesterday
+        day = (today or date.today()).toordinal()
+        if not self.daily_focus.get(day):
+            day -= 1
+
+        streak = 0
+        while self.daily_focus.get(day):
+            streak += 1
+            day -= 1
+        return streak
+
+    def get_top_tasks(self, count=8):
+        tasks = sorted(self.task_minutes.items(), key=lambda item: -item[1])
+        return [
+            (task or "(no task)", minutes) for task, minutes in tasks[:count] if minutes > 0
+        ]
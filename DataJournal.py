@@ -0,0 +1,162 @@
+import json
+import os
+import queue
+import threading
+
+
+class DataJournal:
+    # Saves tasks and session history as append-only JSON lines files, so a
+    # save only writes what changed since the last one. Files are written by
+    # a background thread; a file is rewritten in full only when the history
+    # is compacted or the task journal has grown well past the task list.
+    def __init__(
+        self,
+        task_manager,
+        stats_manager,
+        tasks_path="ai_timer_tasks.jsonl",
+        history_path="ai_timer_history.jsonl",
+    ):
+        self.task_manager = task_manager
+        self.stats_manager = stats_manager
+        self.tasks_path = tasks_path
+        self.history_path = history_path
+
+        self.task_ops = []  # ["add" | "update", task, details] or ["remove", task]
+        self.task_lines = 0  # Lines in the tasks file
+        self.saved_tasks = None  # Task list the tasks file describes
+        self.history_batches = []  # Lists of session records not saved yet
+        self.saved_history = None  # History list the history file describes
+
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.run_writer, daemon=True)
+        self.writer.start()
+
+        task_manager.change_listeners.append(self.on_task_change)
+        stats_manager.change_listeners.append(self.on_stats_change)
+
+    def on_task_change(self, op_type, task):
+        if op_type == "task_remove":
+            self.task_ops.append(["remove", task])
+        else:
+            op = "add" if op_type == "task_add" else "update"
+            self.task_ops.append([op, task, dict(self.task_manager.get_details(task))])
+
+    def on_stats_change(self, op_type, **fields):
+        if op_type == "session_add":
+            self.history_batches.append(fields["records"])
+
+    @staticmethod
+    def read_lines(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A write cut short by a crash
+                        continue
+        except FileNotFoundError:
+            return
+
+    def load(self):
+        # Replaces tasks and history from the journals when they exist.
+        # Settings files from before the journals keep their data and are
+        # migrated on the next save.
+        tasks = []
+        task_details = {}
+        removals = {}
+        lines = 0
+        for op in self.read_lines(self.tasks_path):
+            lines += 1
+            if op[0] == "add":
+                tasks.append(op[1])
+                task_details[op[1]] = op[2]
+            elif op[0] == "update":
+                if op[1] in task_details:
+                    task_details[op[1]] = op[2]
+            else:
+                removals[op[1]] = removals.get(op[1], 0) + 1
+
+        if lines:
+            # A removal always takes the earliest copy of a task still listed
+            remaining = []
+            for task in tasks:
+                if removals.get(task):
+                    removals[task] -= 1
+                else:
+                    remaining.append(task)
+            task_details = {task: task_details[task] for task in dict.fromkeys(remaining)}
+            self.task_manager.load_from_settings(
+                {"tasks": remaining, "task_details": task_details}
+            )
+            self.saved_tasks = self.task_manager.tasks
+            self.task_lines = lines
+
+        history = []
+        for records in self.read_lines(self.history_path):
+            history.extend(records)
+        if history or os.path.exists(self.history_path):
+            self.stats_manager.session_history = history
+            self.saved_history = history
+
+        # Changes made while loading are already in the files
+        self.task_ops = []
+        self.history_batches = []
+
+    def save(self):
+        tasks = self.task_manager.tasks
+        if tasks is not self.saved_tasks or self.task_lines > 2 * len(tasks) + 1000:
+            # A new task list, or a journal mostly made of old changes
+            ops = [
+                ["add", task, dict(self.task_manager.get_details(task))] for task in tasks
+            ]
+            self.writes.put((self.tasks_path, ops, True))
+            self.task_lines = len(ops)
+            self.saved_tasks = tasks
+        elif self.task_ops:
+            self.writes.put((self.tasks_path, self.task_ops, False))
+            self.task_lines += len(self.task_ops)
+        self.task_ops = []
+
+        history = self.stats_manager.session_history
+        if history is not self.saved_history:
+            # Compaction moved old sessions to the archive
+            self.writes.put((self.history_path, [list(history)], True))
+            self.saved_history = history
+        elif self.history_batches:
+            self.writes.put((self.history_path, self.history_batches, False))
+        self.history_batches = []
+
+    def run_writer(self):
+        while True:
+            write = self.writes.get()
+            if write is None:
+                self.writes.task_done()
+                break
+
+            path, lines, rewrite = write
+            try:
+                if rewrite:
+                    temp_path = path + ".tmp"
+                    with open(temp_path, "w", encoding="utf-8") as f:
+                        for line in lines:
+                            f.write(json.dumps(line) + "\n")
+                    os.replace(temp_path, path)
+                else:
+                    with open(path, "a", encoding="utf-8") as f:
+                        for line in lines:
+                            f.write(json.dumps(line) + "\n")
+            except Exception as e:
+                print(f"Error saving {path}: {str(e)}")
+            self.writes.task_done()
+
+    def flush(self):
+        # Waits until every queued write has reached its file
+        if self.writer.is_alive():
+            self.writes.join()
+
+    def close(self):
+        # Waits for queued writes to reach the disk
+        if self.writer.is_alive():
+            self.writes.put(None)
+            self.writer.join()
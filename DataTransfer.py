@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+from StatsManager import StatsManager
+
+
+TASK_FIELDS = ("task", "pomodoros", "done", "priority", "deadline")
+
+
+class DataTransfer:
+    BATCH_SIZE = 5000
+
+    @staticmethod
+    def iter_records(f, path):
+        # Yields one record dict per row without reading the whole file, or
+        # None for a line that is not valid JSON
+        if path.lower().endswith(".csv"):
+            reader = csv.reader(f)
+            header = next(reader, [])
+            for row in reader:
+                yield dict(zip(header, row))
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None
+
+    @staticmethod
+    def iter_batches(path, parse_record, batch_size=None):
+        # Yields (batch, fraction of the file read, rows skipped so far).
+        # Rows that fail to parse are counted and skipped.
+        batch_size = batch_size or DataTransfer.BATCH_SIZE
+        total = os.path.getsize(path) or 1
+        batch = []
+        skipped = 0
+
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for record in DataTransfer.iter_records(f, path):
+                if record is None:
+                    skipped += 1
+                    continue
+
+                try:
+                    batch.append(parse_record(record))
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+                    continue
+
+                if len(batch) >= batch_size:
+                    yield batch, f.buffer.tell() / total, skipped
+                    batch = []
+
+        yield batch, 1.0, skipped
+
+    @staticmethod
+    def write_records(path, fields, records, progress=None):
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.writer(f)
+                writer.writerow(fields)
+                write_batch = lambda batch: writer.writerows(
+                    [record[field] for field in fields] for record in batch
+                )
+            else:
+                encode = json.JSONEncoder().encode
+                write_batch = lambda batch: f.writelines(
+                    encode(record) + "\n" for record in batch
+                )
+
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= DataTransfer.BATCH_SIZE:
+                    write_batch(batch)
+                    count += len(batch)
+                    batch = []
+                    if progress:
+                        progress(count)
+
+            write_batch(batch)
+            count += len(batch)
+
+        return count
+
+    @staticmethod
+    def parse_task(record):
+        task = str(record["task"]).strip()
+        if not task:
+            raise ValueError("Empty task")
+
+        deadline = record.get("deadline")
+        return (
+            task,
+            int(record.get("pomodoros") or 1),
+            int(record.get("priority") or 2),
+            float(deadline) if deadline else None,
+            max(0, int(record.get("done") or 0)),
+        )
+
+    @staticmethod
+    def parse_session(record):
+        mode = record["mode"]
+        if mode not in ("Work", "Break"):
+            raise ValueError(f"Unknown mode: {mode}")
+
+        return [
+            float(record["ended_at"]),
+            int(float(record["minutes"])),
+            mode,
+            record.get("task") or "",
+            1 if str(record.get("completed", 1)) in ("1", "True", "true") else 0,
+        ]
+
+    @staticmethod
+    def export_tasks(path, task_manager, progress=None):
+        return DataTransfer.write_records(
+            path, TASK_FIELDS, task_manager.iter_tasks(), progress
+        )
+
+    @staticmethod
+    def export_sessions(path, stats_manager, progress=None, archive=None):
+        return DataTransfer.write_records(
+            path,
+            StatsManager.SESSION_FIELDS,
+            stats_manager.iter_sessions(archive),
+            progress,
+        )
@@ -0,0 +1,101 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+class HandlerProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.timings = {}  # name -> [calls, total seconds, max seconds]
+        self.profile = None
+        self._lock = threading.Lock()
+
+    def enable(self):
+        if self.enabled:
+            return
+
+        self.timings = {}
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        tracemalloc.start()
+        self.enabled = True
+
+    def disable(self, path="ai_timer_profile.txt"):
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        self.profile.disable()
+        self.dump(path)
+        tracemalloc.stop()
+
+    def record(self, name, elapsed):
+        with self._lock:
+            timing = self.timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def profiled(self, name):
+        # Times the wrapped handler while profiling is on; otherwise the only
+        # cost is one attribute check
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def get_report_text(self):
+        report = "Handler timings:\n"
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: -item[1][1])
+        for name, (calls, total, longest) in timings:
+            report += (
+                f"  {name}: {calls} calls, {total * 1000:.1f} ms total, "
+                f"{total / calls * 1000:.1f} ms avg, {longest * 1000:.1f} ms max\n"
+            )
+
+        if self.profile:
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(30)
+            report += "\nUI thread profile:\n" + stream.getvalue()
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report += f"\nMemory: {current / 1024:.0f} KiB current, {peak / 1024:.0f} KiB peak\n"
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[:10]:
+                report += f"  {stat}\n"
+
+        return report
+
+    def dump(self, path="ai_timer_profile.txt"):
+        try:
+            with open(path, "w") as f:
+                f.write(self.get_report_text())
+            return True
+        except Exception as e:
+            print(f"Error writing profile: {str(e)}")
+            return False
+
+
+profiler = HandlerProfiler()
+profiled = profiler.profiled
+
+# Opt in from the environment, e.g. AI_TIMER_PROFILE=1 python ai_time.py
+if os.environ.get("AI_TIMER_PROFILE"):
+    profiler.enable()
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+
+# Each entry is (tip, times of day, session stages) it suits; None matches all
+TIP_LIBRARY = [
+    ("Pick the one task that would make today a success and start there while your mind is fresh.", ("morning",), ("warming_up",)),
+    ("Before you begin, write down what 'done' looks like for this session in one sentence.", None, ("warming_up",)),
+    ("Start with a two-minute version of the task - momentum is easier to keep than to find.", None, ("warming_up",)),
+    ("Morning focus is usually your sharpest. Save email and messages for after this session.", ("morning",), None),
+    ("Close every tab and window you don't need for this task, then pick the single next step.", None, None),
+    ("Write down any distracting thought on paper and return to it during your break.", None, None),
+    ("Silence notifications until this session ends - the messages will still be there.", None, None),
+    ("Break the current task into a step you can finish in the next ten minutes.", None, ("warming_up", "steady")),
+    ("You're in a rhythm now. Keep the same task going rather than switching contexts.", None, ("steady",)),
+    ("The post-lunch dip is real. Sit up straight, drink some water and tackle a concrete, hands-on step.", ("afternoon",), None),
+    ("Review what you finished in earlier sessions - it's a quick way to see where to go next.", ("afternoon", "evening"), ("steady", "long_haul")),
+    ("You've put in solid focus today. Choose lighter, well-defined work for this session.", None, ("long_haul",)),
+    ("Long days drain attention. Aim to finish one small thing completely rather than start something big.", None, ("long_haul",)),
+    ("It's getting late - use this session to wrap up and leave a note for where to resume tomorrow.", ("evening", "night"), None),
+    ("Working late? Keep this session short and stop when the timer ends.", ("night",), None),
+]
+
+BREAK_LIBRARY = [
+    ("Stand up, stretch your arms overhead and roll your shoulders for a minute.", ("short",), None),
+    ("Look at something at least 20 feet away for 20 seconds to rest your eyes.", ("short",), None),
+    ("Refill your water and take a few slow, deep breaths before sitting back down.", ("short",), None),
+    ("Close your eyes and relax your jaw, neck and shoulders for a few breaths.", ("short",), ("tired",)),
+    ("Take a short walk, ideally outside or near a window, and let your mind wander.", ("long",), None),
+    ("Grab a healthy snack and eat it away from your desk.", ("long",), ("tired",)),
+    ("Do a few minutes of light stretching for your back, hips and wrists.", ("long",), None),
+    ("You've focused a lot today. Step fully away from screens for this whole break.", None, ("tired",)),
+    ("Tidy your desk for a minute - a clear space helps the next session start faster.", ("short",), ("fresh",)),
+]
+
+TIMES_OF_DAY = ("morning", "afternoon", "evening", "night")
+SESSION_STAGES = ("warming_up", "steady", "long_haul")
+BREAK_LENGTHS = ("short", "long")
+FATIGUE_LEVELS = ("fresh", "tired")
+
+
+def _build_index(library, first_keys, second_keys):
+    # Precompute the matching entries for every feature combination so a
+    # lookup is a single dictionary access
+    index = {}
+    for first in first_keys:
+        for second in second_keys:
+            index[(first, second)] = tuple(
+                text
+                for text, firsts, seconds in library
+                if (firsts is None or first in firsts)
+                and (seconds is None or second in seconds)
+            )
+    return index
+
+
+TIP_INDEX = _build_index(TIP_LIBRARY, TIMES_OF_DAY, SESSION_STAGES)
+BREAK_INDEX = _build_index(BREAK_LIBRARY, BREAK_LENGTHS, FATIGUE_LEVELS)
+
+
+class LocalSuggestionEngine:
+    def __init__(self):
+        # Rotates through the matching entries so tips don't repeat back to back
+        self.positions = {}
+
+    def _next(self, index, key):
+        entries = index[key]
+        position = self.positions.get(key, 0)
+        self.positions[key] = position + 1
+        return entries[position % len(entries)]
+
+    def get_time_of_day(self, hour=None):
+        if hour is None:
+            hour = datetime.now().hour
+        if 5 <= hour < 12:
+            return "morning"
+        if 12 <= hour < 17:
+            return "afternoon"
+        if 17 <= hour < 22:
+            return "evening"
+        return "night"
+
+    def get_productivity_tip(self, stats, hour=None):
+        pomodoros = stats.get("pomodoros_completed", 0)
+        focus_time = stats.get("focus_time", 0)
+
+        if pomodoros == 0:
+            stage = "warming_up"
+        elif pomodoros < 6 and focus_time < 180:
+            stage = "steady"
+        else:
+            stage = "long_haul"
+
+        return self._next(TIP_INDEX, (self.get_time_of_day(hour), stage))
+
+    def get_break_activity(self, focus_time, break_minutes=5):
+        length = "short" if break_minutes < 10 else "long"
+        fatigue = "fresh" if focus_time < 120 else "tired"
+        return self._next(BREAK_INDEX, (length, fatigue))
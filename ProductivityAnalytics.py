@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+class ProductivityAnalytics:
+    PERIODS = ("week", "month")
+    # Longest session considered when matching archived sessions by start time
+    MAX_SESSION_SECONDS = 24 * 3600
+
+    def __init__(self, stats_manager, archive=None):
+        self.stats_manager = stats_manager
+        self.archive = archive
+        self.reset_columns()
+
+    def reset_columns(self):
+        # Columnar copy of the session history, extended as sessions are added
+        self.report_cache = {}
+        self.source = None
+        self.extracted = 0
+        self.ended_at = np.empty(0, dtype=np.float64)
+        self.minutes = np.empty(0, dtype=np.float32)
+        self.is_work = np.empty(0, dtype=bool)
+        self.completed = np.empty(0, dtype=bool)
+        self.task_ids = np.empty(0, dtype=np.int32)
+        if self.archive is None:
+            self.task_names = []
+            self.task_index = {}
+
+    def _task_id(self, task):
+        # Share task ids with the archive so both can be combined directly
+        if self.archive is not None:
+            return self.archive.get_task_id(task)
+
+        task_id = self.task_index.get(task)
+        if task_id is None:
+            task_id = len(self.task_names)
+            self.task_index[task] = task_id
+            self.task_names.append(task)
+        return task_id
+
+    def get_task_names(self):
+        return self.archive.task_names if self.archive is not None else self.task_names
+
+    def get_period_columns(self, start_ts, end_ts):
+        # Recent sessions from memory plus any archived sessions in range
+        self.update_columns()
+        ended_at = self.ended_at
+        minutes = self.minutes
+        is_work = self.is_work
+        completed = self.completed
+        task_ids = self.task_ids
+
+        if self.archive is not None and self.archive.rows:
+            archived = self.archive.get_range(start_ts, end_ts + self.MAX_SESSION_SECONDS)
+            ended_at = np.concatenate([archived["ended_at"], ended_at])
+            minutes = np.concatenate([archived["minutes"], minutes])
+            is_work = np.concatenate([archived["mode"] == 0, is_work])
+            completed = np.concatenate([archived["completed"].astype(bool), completed])
+            task_ids = np.concatenate([archived["task_id"], task_ids])
+
+        return ended_at, minutes, is_work, completed, task_ids
+
+    def update_columns(self):
+        history = self.stats_manager.session_history
+        if history is not self.source or len(history) < self.extracted:
+            # The history was replaced, start over
+            self.reset_columns()
+            self.source = history
+
+        new_records = history[self.extracted :]
+        if not new_records:
+            return
+
+        # Reports over the old data are stale now
+        self.report_cache = {}
+        count = len(new_records)
+        self.ended_at = np.concatenate(
+            [self.ended_at, np.fromiter((r[0] for r in new_records), np.float64, count)]
+        )
+        self.minutes = np.concatenate(
+            [self.minutes, np.fromiter((r[1] for r in new_records), np.float32, count)]
+        )
+        self.is_work = np.concatenate(
+            [self.is_work, np.fromiter((r[2] == "Work" for r in new_records), bool, count)]
+        )
+        self.completed = np.concatenate(
+            [self.completed, np.fromiter((r[4] for r in new_records), bool, count)]
+        )
+        self.task_ids = np.concatenate(
+            [
+                self.task_ids,
+                np.fromiter((self._task_id(r[3]) for r in new_records), np.int32, count),
+            ]
+        )
+        self.extracted = len(history)
+
+    def get_period_bounds(self, period, now=None):
+        now = now or datetime.now()
+        today = datetime(now.year, now.month, now.day)
+        if period == "week":
+            start = today - timedelta(days=today.weekday())
+            end = start + timedelta(days=7)
+        else:
+            start = today.replace(day=1)
+            end = (start + timedelta(days=32)).replace(day=1)
+        return start, end
+
+    def get_report(self, period="week", now=None):
+        self.update_columns()
+        start, end = self.get_period_bounds(period, now)
+
+        key = (period, start)
+        report = self.report_cache.get(key)
+        if report is not None:
+            return report
+
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        ended_at, all_minutes, is_work, completed, task_ids = self.get_period_columns(
+            start_ts, end_ts
+        )
+        session_start = ended_at - all_minutes * 60
+        in_period = (session_start >= start_ts) & (session_start < end_ts)
+        work = in_period & is_work
+        done = work & completed
+        minutes = all_minutes[done]
+
+        # Local weekday and hour of each session start. The UTC offset at the
+        # start of the period is applied to the whole period.
+        offset = start.astimezone().utcoffset().total_seconds()
+        local = session_start[done] + offset
+        days = np.floor_divide(local, 86400).astype(np.int64)
+        weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+        hours = ((local % 86400) // 3600).astype(np.int64)
+        heatmap = np.bincount(
+            weekdays * 24 + hours, weights=minutes, minlength=7 * 24
+        ).reshape(7, 24)
+
+        # Focus minutes per task
+        task_names = self.get_task_names()
+        task_minutes = np.bincount(
+            task_ids[done], weights=minutes, minlength=len(task_names)
+        )
+        top_tasks = [
+            (task_names[i] or "(no task)", float(task_minutes[i]))
+            for i in np.argsort(task_minutes)[::-1][:5]
+            if task_minutes[i] > 0
+        ]
+
+        # Daily focus totals and completion rates across the period
+        period_days = (end - start).days
+        day_index = np.floor_divide(session_start[work] - start_ts, 86400).astype(np.int64)
+        started = np.bincount(day_index, minlength=period_days)[:period_days]
+        finished = np.bincount(
+            day_index, weights=completed[work], minlength=period_days
+        )[:period_days]
+        daily_focus = np.bincount(
+            day_index,
+            weights=all_minutes[work] * completed[work],
+            minlength=period_days,
+        )[:period_days]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            completion_rate = np.where(started > 0, finished / started, np.nan)
+
+        active_days = daily_focus[daily_focus > 0]
+        report = {
+            "period": period,
+            "start": start,
+            "sessions": int(done.sum()),
+            "sessions_started": int(work.sum()),
+            "focus_minutes": float(minutes.sum()),
+            "heatmap": heatmap,
+            "top_tasks": top_tasks,
+            "daily_focus": daily_focus,
+            "completion_rate": completion_rate,
+            "session_percentiles": (
+                np.percentile(minutes, [50, 90]) if minutes.size else np.zeros(2)
+            ),
+            "daily_percentiles": (
+                np.percentile(active_days, [50, 90]) if active_days.size else np.zeros(2)
+            ),
+        }
+        self.report_cache[key] = report
+        return report
+
+    def get_report_text(self, period="week", now=None):
+        report = self.get_report(period, now)
+        label = "This week" if period == "week" else "This month"
+
+        if not report["sessions_started"]:
+            return f"{label}: no sessions recorded yet."
+
+        started = report["sessions_started"]
+        heatmap = report["heatmap"]
+        weekday, hour = np.unravel_index(np.argmax(heatmap), heatmap.shape)
+        weekday_name = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")[weekday]
+        rates = report["completion_rate"]
+        rated_days = rates[~np.isnan(rates)]
+        trend = "n/a"
+        if rated_days.size >= 2:
+            half = rated_days.size // 2
+            change = rated_days[half:].mean() - rated_days[:half].mean()
+            trend = "improving" if change > 0.05 else "declining" if change < -0.05 else "steady"
+
+        report_text = (
+            f"{label} (since {report['start'].strftime('%Y-%m-%d')}):\n"
+            f"Focus time: {report['focus_minutes']:.0f} minutes in {report['sessions']} sessions\n"
+            f"Completion rate: {report['sessions'] / started:.0%} ({trend})\n"
+            f"Session length: median {report['session_percentiles'][0]:.0f} min, "
+            f"p90 {report['session_percentiles'][1]:.0f} min\n"
+            f"Daily focus: median {report['daily_percentiles'][0]:.0f} min, "
+            f"p90 {report['daily_percentiles'][1]:.0f} min\n"
+        )
+        if heatmap.max() > 0:
+            report_text += f"Most focused slot: {weekday_name} {hour:02d}:00\n"
+        if report["top_tasks"]:
+            report_text += "Top tasks:\n"
+            for task, minutes in report["top_tasks"]:
+                report_text += f"  {task}: {minutes:.0f} min\n"
+
+        return report_text
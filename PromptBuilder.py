@@ -0,0 +1,80 @@
+class PromptBuilder:
+    MAX_TASK_CHARS = 120  # Longer task names are cut in prompts
+
+    def __init__(self, task_token_budget=400):
+        self.task_token_budget = task_token_budget  # Tokens allowed for the task list
+        self.task_cache = None  # (key, (text, tokens))
+
+    @staticmethod
+    def estimate_tokens(text):
+        # Rough estimate of ~4 characters per token
+        return len(text) // 4 + 1
+
+    def rank_tasks(self, tasks, current_task="", task_details=None):
+        # Current task first, then priority, nearest deadline and most
+        # recently added
+        task_details = task_details or {}
+
+        def rank(item):
+            index, task = item
+            details = task_details.get(task, {})
+            deadline = details.get("deadline")
+            return (
+                task != current_task,
+                -details.get("priority", 2),
+                deadline is None,
+                deadline or 0,
+                -details.get("order", index),
+            )
+
+        return [task for _, task in sorted(enumerate(tasks), key=rank)]
+
+    def summarize_tasks(self, tasks, task_details=None):
+        # One line standing in for the tasks that did not fit
+        task_details = task_details or {}
+        counts = {3: 0, 2: 0, 1: 0}
+        deadlines = []
+        for task in tasks:
+            details = task_details.get(task, {})
+            priority = details.get("priority", 2)
+            counts[priority] = counts.get(priority, 0) + 1
+            if details.get("deadline"):
+                deadlines.append(details["deadline"])
+
+        summary = (
+            f"- ...and {len(tasks)} more tasks ({counts[3]} high, {counts[2]} medium, "
+            f"{counts[1]} low priority"
+        )
+        if deadlines:
+            summary += f", {len(deadlines)} with deadlines"
+        return summary + ")"
+
+    def build_task_text(
+        self, tasks, current_task="", task_details=None, tasks_version=None
+    ):
+        # Returns the task list text for a prompt and its estimated tokens.
+        # The text only changes with the task list, so it is cached. Passing
+        # TaskManager.version keys the cache without copying a large list.
+        tasks_key = tuple(tasks) if tasks_version is None else tasks_version
+        key = (tasks_key, current_task, self.task_token_budget)
+        if self.task_cache and self.task_cache[0] == key:
+            return self.task_cache[1]
+
+        lines = []
+        tokens = 0
+        ranked = self.rank_tasks(tasks, current_task, task_details)
+        for i, task in enumerate(ranked):
+            line = f"- {task[: self.MAX_TASK_CHARS]}"
+            line_tokens = self.estimate_tokens(line)
+            # Leave room for the summary line of whatever is left out
+            if tokens + line_tokens > self.task_token_budget - 30 and i < len(ranked) - 1:
+                summary = self.summarize_tasks(ranked[i:], task_details)
+                lines.append(summary)
+                tokens += self.estimate_tokens(summary)
+                break
+            lines.append(line)
+            tokens += line_tokens
+
+        result = ("\n".join(lines), tokens)
+        self.task_cache = (key, result)
+        return result
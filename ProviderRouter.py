@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from AIResilience import AIResilience, CircuitOpenError
+from RequestCoalescer import RequestCancelledError
+
+
+class AIProvider:
+    def __init__(self, name, model, client, resilience=None):
+        self.name = name
+        self.model = model
+        self.client = client
+        self.resilience = resilience or AIResilience()
+        self.latency = None  # Moving average of successful calls, seconds
+        self.error_rate = 0.0  # Moving average of failures, 0 to 1
+        self.recent_latencies = deque(maxlen=50)
+
+    def is_healthy(self):
+        breaker = self.resilience.breaker
+        return breaker.state == "closed" or (
+            breaker.state == "open" and breaker.seconds_until_retry() == 0
+        )
+
+    def get_score(self):
+        # Untried providers go first so every provider gets measured; one
+        # that has only failed so far goes after every measured provider
+        if self.latency is None:
+            return float("inf") if self.error_rate else 0.0
+        return self.latency * (1 + 4 * self.error_rate)
+
+
+class ProviderRouter:
+    def __init__(self, smoothing=0.2, default_hedge_delay=2.0):
+        self.smoothing = smoothing  # Weight of the newest sample in the averages
+        self.default_hedge_delay = default_hedge_delay
+        self.providers = []
+        self._lock = threading.Lock()
+
+    def set_provider(self, name, model, client, resilience=None):
+        # Adds a provider or reconfigures the one with the same name,
+        # keeping its latency history
+        with self._lock:
+            for provider in self.providers:
+                if provider.name == name:
+                    provider.model = model
+                    provider.client = client
+                    if resilience is not None:
+                        provider.resilience = resilience
+                    return provider
+
+            provider = AIProvider(name, model, client, resilience)
+            self.providers.append(provider)
+            return provider
+
+    def remove_provider(self, name):
+        with self._lock:
+            self.providers = [p for p in self.providers if p.name != name]
+
+    def get_ranked(self):
+        # Fastest healthy provider first; unhealthy ones are kept last so
+        # they still get a probe once their circuit allows it
+        with self._lock:
+            providers = list(self.providers)
+        return sorted(providers, key=lambda p: (not p.is_healthy(), p.get_score()))
+
+    def record_success(self, provider, latency):
+        with self._lock:
+            if provider.latency is None:
+                provider.latency = latency
+            else:
+                provider.latency += self.smoothing * (latency - provider.latency)
+            provider.error_rate *= 1 - self.smoothing
+            provider.recent_latencies.append(latency)
+
+    def record_failure(self, provider):
+        with self._lock:
+            provider.error_rate += self.smoothing * (1 - provider.error_rate)
+
+    def get_hedge_delay(self, provider):
+        # p95 of recent latencies: only the slowest calls get a hedge
+        with self._lock:
+            latencies = sorted(provider.recent_latencies)
+        if len(latencies) < 5:
+            return self.default_hedge_delay
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def get_status_text(self):
+        status_text = "Providers:\n"
+        for provider in self.get_ranked():
+            latency = (
+                f"{provider.latency:.2f}s avg" if provider.latency is not None else "untried"
+            )
+            status_text += (
+                f"  {provider.name} ({provider.model}): {latency}, "
+                f"{provider.error_rate:.0%} errors, "
+                f"{'healthy' if provider.is_healthy() else 'unavailable'}\n"
+            )
+        return status_text
+
+    def call_provider(self, provider, max_retries=None, before_attempt=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = provider.resilience.call(
+                provider.client.chat.completions.create,
+                max_retries=max_retries,
+                before_attempt=before_attempt,
+                model=provider.model,
+                **kwargs,
+            )
+        except (CircuitOpenError, RequestCancelledError):
+            raise
+        except Exception:
+            self.record_failure(provider)
+            raise
+
+        self.record_success(provider, time.perf_counter() - start)
+        return response
+
+    def call(self, max_retries=None, before_attempt=None, **kwargs):
+        # Tries providers in ranked order, failing over on errors
+        last_error = None
+        for provider in self.get_ranked():
+            try:
+                return self.call_provider(provider, max_retries, before_attempt, **kwargs)
+            except RequestCancelledError:
+                raise
+            except Exception as e:
+                last_error = e
+
+        if last_error is None:
+            raise CircuitOpenError("No AI provider configured")
+        raise last_error
+
+    def call_hedged(
+        self, max_retries=None, before_attempt=None, record_extra=None, **kwargs
+    ):
+        # Sends to the best provider and, if it has not answered after its
+        # p95 latency, to the next one as well. The first answer wins; the
+        # slower request finishes in the background and, since it is billed
+        # all the same, is passed to record_extra(response, latency).
+        ranked = [p for p in self.get_ranked() if p.is_healthy()]
+        if len(ranked) < 2:
+            return self.call(max_retries, before_attempt, **kwargs)
+
+        results = queue.Queue()
+        answered = threading.Event()
+        lock = threading.Lock()
+
+        def run(provider):
+            start = time.perf_counter()
+            try:
+                response = self.call_provider(provider, max_retries, before_attempt, **kwargs)
+            except Exception as e:
+                results.put((False, e))
+                return
+
+            with lock:
+                won = not answered.is_set()
+                answered.set()
+            if won:
+                results.put((True, response))
+            elif record_extra:
+                record_extra(response, time.perf_counter() - start)
+
+        threading.Thread(target=run, args=(ranked[0],), daemon=True).start()
+        pending = 1
+        try:
+            ok, value = results.get(timeout=self.get_hedge_delay(ranked[0]))
+            pending -= 1
+            if ok:
+                return value
+        except queue.Empty:
+            pass
+
+        threading.Thread(target=run, args=(ranked[1],), daemon=True).start()
+        pending += 1
+        while pending:
+            ok, value = results.get()
+            pending -= 1
+            if ok:
+                return value
+
+        raise value
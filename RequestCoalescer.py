@@ -0,0 +1,63 @@
+import threading
+
+
+class RequestCancelledError(Exception):
+    pass
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.generation = 0
+
+    def next_generation(self):
+        # Called when the session changes; requests tagged with an older
+        # generation are superseded
+        with self._lock:
+            self.generation += 1
+            return self.generation
+
+    def is_current(self, generation):
+        return generation is None or generation == self.generation
+
+    def check_current(self, generation):
+        if not self.is_current(generation):
+            raise RequestCancelledError("Request superseded by a newer session")
+
+    def run(self, key, func, generation=None):
+        while True:
+            self.check_current(generation)
+
+            with self._lock:
+                flight = self._in_flight.get(key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = _Flight()
+                    self._in_flight[key] = flight
+
+            if is_leader:
+                try:
+                    flight.result = func()
+                except Exception as e:
+                    flight.error = e
+                finally:
+                    with self._lock:
+                        del self._in_flight[key]
+                    flight.done.set()
+            else:
+                flight.done.wait()
+                # The leader was superseded but this caller may not be
+                if isinstance(flight.error, RequestCancelledError):
+                    continue
+
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, not is_leader
@@ -0,0 +1,144 @@
+import json
+import os
+
+import numpy as np
+
+
+class SessionArchive:
+    # One fixed-width file per column, appended to as history is compacted
+    COLUMNS = {
+        "ended_at": np.float64,
+        "minutes": np.float32,
+        "mode": np.uint8,  # 0 for Work, 1 for Break
+        "completed": np.uint8,
+        "task_id": np.int32,
+    }
+
+    def __init__(self, path="session_archive"):
+        self.path = path
+        self.rows = 0
+        self.is_sorted = True  # Whether ended_at is in ascending order
+        self.task_names = []
+        self.task_index = {}
+        self.columns = {name: np.empty(0, dtype) for name, dtype in self.COLUMNS.items()}
+        self.open()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def open(self):
+        try:
+            with open(self._meta_path(), "r") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading session archive: {str(e)}")
+            return
+
+        self.rows = meta["rows"]
+        self.is_sorted = meta["sorted"]
+        self.task_names = meta["tasks"]
+        self.task_index = {task: i for i, task in enumerate(self.task_names)}
+
+        for name, dtype in self.COLUMNS.items():
+            # Mapped, not loaded: pages are read only when a report needs them
+            self.columns[name] = (
+                np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(self.rows,))
+                if self.rows
+                else np.empty(0, dtype)
+            )
+
+    def get_task_id(self, task):
+        task_id = self.task_index.get(task)
+        if task_id is None:
+            task_id = len(self.task_names)
+            self.task_index[task] = task_id
+            self.task_names.append(task)
+        return task_id
+
+    def append(self, records):
+        # records are session history lists: ended_at, minutes, mode, task, completed
+        if not records:
+            return
+
+        records = sorted(records, key=lambda record: record[0])
+        count = len(records)
+        new_columns = {
+            "ended_at": np.fromiter((r[0] for r in records), np.float64, count),
+            "minutes": np.fromiter((r[1] for r in records), np.float32, count),
+            "mode": np.fromiter((r[2] != "Work" for r in records), np.uint8, count),
+            "completed": np.fromiter((r[4] for r in records), np.uint8, count),
+            "task_id": np.fromiter(
+                (self.get_task_id(r[3]) for r in records), np.int32, count
+            ),
+        }
+
+        # A plain bool: NumPy comparisons give numpy.bool_, which json rejects
+        is_sorted = bool(
+            self.is_sorted
+            and (
+                not self.rows
+                or self.columns["ended_at"][-1] <= new_columns["ended_at"][0]
+            )
+        )
+
+        os.makedirs(self.path, exist_ok=True)
+        for name, values in new_columns.items():
+            path = self._column_path(name)
+            committed_size = self.rows * values.itemsize
+            if os.path.exists(path) and os.path.getsize(path) != committed_size:
+                # Left over from an append that never reached the metadata
+                os.truncate(path, committed_size)
+            with open(path, "ab") as f:
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        # The metadata is replaced atomically and is what commits the rows
+        meta = {"rows": self.rows + count, "sorted": is_sorted, "tasks": self.task_names}
+        temp_path = self._meta_path() + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._meta_path())
+
+        self.open()
+
+    def get_range(self, start_ts, end_ts):
+        # Column slices for sessions ending in [start_ts, end_ts). On sorted
+        # data only the matching pages of the mapped files are touched.
+        ended_at = self.columns["ended_at"]
+        if self.is_sorted:
+            first, last = np.searchsorted(ended_at, [start_ts, end_ts])
+            return {name: column[first:last] for name, column in self.columns.items()}
+
+        mask = (ended_at >= start_ts) & (ended_at < end_ts)
+        return {name: column[mask] for name, column in self.columns.items()}
+
+    def iter_sessions(self):
+        # Streams archived sessions in the same shape as StatsManager.iter_sessions
+        chunk = 10000
+        for start in range(0, self.rows, chunk):
+            columns = {
+                name: column[start : start + chunk].tolist()
+                for name, column in self.columns.items()
+            }
+            for ended_at, minutes, mode, completed, task_id in zip(
+                columns["ended_at"],
+                columns["minutes"],
+                columns["mode"],
+                columns["completed"],
+                columns["task_id"],
+            ):
+                yield {
+                    "ended_at": ended_at,
+                    "minutes": minutes,
+                    "mode": "Work" if mode == 0 else "Break",
+                    "task": self.task_names[task_id],
+                    "completed": completed,
+                }
@@ -0,0 +1,119 @@
+import os
+import struct
+import time
+import zlib
+
+
+class SessionCheckpoint:
+    # magic, version, active, paused, mode, deadline, remaining time,
+    # session duration, schedule position, mode index, length of the current
+    # task in bytes, then the task itself and a CRC32 of it all
+    RECORD = struct.Struct("<4sHBBBxdiiiiH")
+    CRC = struct.Struct("<I")
+    MAGIC = b"AITC"
+    VERSION = 2
+    MAX_TASK_BYTES = 1024
+
+    def __init__(self, path="ai_timer_session.chk"):
+        self.path = path
+        self.fd = None
+
+    def _open(self):
+        if self.fd is None:
+            # O_BINARY keeps Windows from translating newline bytes
+            flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self.fd = os.open(self.path, flags, 0o600)
+        return self.fd
+
+    def save(self, timer_model, current_task=""):
+        # The record is tiny, so it is overwritten in place instead of
+        # rewriting the settings file. Bytes left over from a longer earlier
+        # record are ignored on load.
+        task = current_task.encode("utf-8")[: self.MAX_TASK_BYTES]
+        task = task.decode("utf-8", "ignore").encode("utf-8")
+        active = timer_model.timer_active
+        paused = timer_model.timer_paused
+        deadline = (
+            time.time() + timer_model.remaining_time if active and not paused else 0.0
+        )
+        record = self.RECORD.pack(
+            self.MAGIC,
+            self.VERSION,
+            active,
+            paused,
+            0 if timer_model.current_mode == "Work" else 1,
+            deadline,
+            timer_model.remaining_time,
+            timer_model.session_duration,
+            timer_model.schedule_position,
+            timer_model.mode_index,
+            len(task),
+        )
+        record += task
+        data = record + self.CRC.pack(zlib.crc32(record))
+
+        try:
+            fd = self._open()
+            if hasattr(os, "pwrite"):
+                os.pwrite(fd, data, 0)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, data)
+            os.fsync(fd)
+            return True
+        except OSError as e:
+            print(f"Error writing session checkpoint: {str(e)}")
+            return False
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(self.RECORD.size + self.MAX_TASK_BYTES + self.CRC.size)
+        except FileNotFoundError:
+            return None
+
+        if len(data) < self.RECORD.size + self.CRC.size:
+            return None
+
+        task_length = self.RECORD.unpack_from(data)[-1]
+        size = self.RECORD.size + task_length
+        if len(data) < size + self.CRC.size:
+            return None
+
+        record, crc = data[:size], data[size : size + self.CRC.size]
+        if self.CRC.unpack(crc)[0] != zlib.crc32(record):
+            # Torn or corrupted write
+            return None
+
+        (
+            magic,
+            version,
+            active,
+            paused,
+            mode,
+            deadline,
+            remaining_time,
+            session_duration,
+            schedule_position,
+            mode_index,
+            _,
+        ) = self.RECORD.unpack_from(record)
+        if magic != self.MAGIC or version != self.VERSION:
+            return None
+
+        return {
+            "timer_active": bool(active),
+            "timer_paused": bool(paused),
+            "current_mode": "Work" if mode == 0 else "Break",
+            "deadline": deadline,
+            "remaining_time": remaining_time,
+            "session_duration": session_duration,
+            "schedule_position": schedule_position,
+            "mode_index": mode_index,
+            "current_task": record[self.RECORD.size :].decode("utf-8"),
+        }
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
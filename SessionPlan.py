@@ -0,0 +1,95 @@
+class SessionPlan:
+    def __init__(self, name, steps):
+        if not steps:
+            raise ValueError("A session plan needs at least one step")
+
+        self.name = name
+        self.steps = tuple((mode, int(minutes)) for mode, minutes in steps)
+
+        for mode, minutes in self.steps:
+            if mode not in ("Work", "Break") or minutes <= 0:
+                raise ValueError(f"Invalid step in plan {name}: {mode} {minutes}")
+
+        # Compiled schedule: everything the timer needs per step is
+        # precomputed so lookups are plain tuple indexing
+        self.modes = tuple(mode for mode, _ in self.steps)
+        self.durations = tuple(minutes * 60 for _, minutes in self.steps)
+        self.next_positions = tuple(
+            (i + 1) % len(self.steps) for i in range(len(self.steps))
+        )
+        self.first_position = {}
+        for i, mode in enumerate(self.modes):
+            self.first_position.setdefault(mode, i)
+
+    @classmethod
+    def cycle(cls, name, work, short_break, long_break=None, long_break_every=1):
+        steps = []
+        for i in range(long_break_every):
+            is_last = i == long_break_every - 1
+            steps.append(("Work", work))
+            steps.append(("Break", long_break if long_break and is_last else short_break))
+        return cls(name, steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def position_for_mode(self, position, mode):
+        # Keep the current position if it agrees with the mode, otherwise
+        # jump to the first step of that mode
+        if position < len(self.modes) and self.modes[position] == mode:
+            return position
+        return self.first_position.get(mode, 0)
+
+    def get_settings_dict(self):
+        return {"name": self.name, "steps": [list(step) for step in self.steps]}
+
+
+class SessionPlanRegistry:
+    CUSTOM = "Custom"
+
+    def __init__(self):
+        self.plans = {}
+        self.register(SessionPlan.cycle("Pomodoro (25/5)", 25, 5))
+        self.register(SessionPlan.cycle("Long Focus (50/10)", 50, 10))
+        self.register(SessionPlan.cycle(self.CUSTOM, 25, 5))
+        self.register(
+            SessionPlan.cycle("Pomodoro Cycle (4x25/5, 15)", 25, 5, 15, 4)
+        )
+        self.builtin_names = tuple(self.plans)
+        self.custom_times = ("25", "5")
+
+    def register(self, plan):
+        self.plans[plan.name] = plan
+
+    def get(self, name):
+        return self.plans.get(name)
+
+    def names(self):
+        return list(self.plans)
+
+    def set_custom_times(self, work_time, break_time):
+        # Parsed and compiled only when the inputs actually change
+        if (work_time, break_time) != self.custom_times:
+            self.custom_times = (work_time, break_time)
+            try:
+                plan = SessionPlan.cycle(self.CUSTOM, int(work_time), int(break_time))
+            except ValueError:
+                # Keep the slot so the plan order is stable, but mark it unusable
+                plan = None
+            self.plans[self.CUSTOM] = plan
+
+        return None if self.plans[self.CUSTOM] else "Invalid Time"
+
+    def get_user_plans(self):
+        return [
+            plan.get_settings_dict()
+            for name, plan in self.plans.items()
+            if name not in self.builtin_names
+        ]
+
+    def load_user_plans(self, plan_dicts):
+        for plan_dict in plan_dicts:
+            try:
+                self.register(SessionPlan(plan_dict["name"], plan_dict["steps"]))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping invalid session plan: {str(e)}")
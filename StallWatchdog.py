@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+import traceback
+
+
+class StallWatchdog:
+    def __init__(self, expected_interval=1.0, threshold=0.5, sample_interval=0.1):
+        self.expected_interval = expected_interval
+        self.threshold = threshold  # Extra delay tolerated before reporting
+        self.sample_interval = sample_interval
+        self.main_thread_id = threading.main_thread().ident
+        self.last_tick = None  # None while the countdown is not running
+        self.stall_stack = None
+        self.stall_count = 0
+        self.longest_stall = 0.0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    def arm(self):
+        self.last_tick = time.monotonic()
+        self.stall_stack = None
+
+    def disarm(self):
+        self.last_tick = None
+
+    def tick(self):
+        # Called from every countdown tick on the UI thread
+        now = time.monotonic()
+        last_tick = self.last_tick
+        self.last_tick = now
+        if last_tick is None:
+            return
+
+        interval = now - last_tick
+        if interval > self.expected_interval + self.threshold:
+            self.stall_count += 1
+            self.longest_stall = max(self.longest_stall, interval)
+            print(
+                f"Event loop stalled: {interval:.2f}s between timer ticks "
+                f"(expected {self.expected_interval:.2f}s)"
+            )
+            if self.stall_stack:
+                print("UI thread was blocked in:\n" + self.stall_stack)
+        self.stall_stack = None
+
+    def _sample(self):
+        # While a tick is overdue, capture what the UI thread is doing
+        limit = self.expected_interval + self.threshold
+        while True:
+            time.sleep(self.sample_interval)
+            last_tick = self.last_tick
+            if (
+                last_tick is None
+                or self.stall_stack is not None
+                or time.monotonic() - last_tick < limit
+            ):
+                continue
+
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is not None:
+                self.stall_stack = "".join(traceback.format_stack(frame))
@@ -0,0 +1,238 @@
+from datetime import date, timedelta
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QColor, QFont, QPainter, QPixmap
+
+
+class StatsCharts(QWidget):
+    # Daily focus bars, a streak calendar and a per-task breakdown. Each
+    # chart is painted once into a cached pixmap; a finished session only
+    # repaints the bar and calendar cell of its day unless a scale changes.
+    BAR_DAYS = 30
+    CALENDAR_WEEKS = 26
+    TOP_TASKS = 8
+    TITLE_HEIGHT = 20
+    BARS_HEIGHT = 140
+    CELL = 12
+    TASK_ROW = 18
+    # Calendar shading by focus minutes: none, <30, <60, <120, 120+
+    LEVELS = (0, 30, 60, 120)
+    LEVEL_COLORS = ("#ebedf0", "#c6e48b", "#7bc96f", "#239a3b", "#196127")
+
+    def __init__(self, chart_data, parent=None):
+        super().__init__(parent)
+        self.chart_data = chart_data
+        self.pixmaps = {"bars": None, "calendar": None, "tasks": None}
+        self.bar_scale = 60  # Minutes at the top of the bar chart
+        self.drawn_today = None
+        self.calendar_height = self.TITLE_HEIGHT + 7 * (self.CELL + 2) + 6
+        self.tasks_height = self.TITLE_HEIGHT + self.TOP_TASKS * self.TASK_ROW + 6
+        self.setMinimumHeight(
+            self.BARS_HEIGHT + self.calendar_height + self.tasks_height
+        )
+
+    def refresh(self):
+        changed_days = self.chart_data.update()
+        if changed_days is None or self.drawn_today != date.today():
+            self.invalidate()
+            return
+
+        if not changed_days:
+            return
+
+        today = date.today().toordinal()
+        for day in changed_days:
+            if today - day < self.BAR_DAYS and self.pixmaps["bars"]:
+                if self.chart_data.daily_focus[day] > self.bar_scale:
+                    self.pixmaps["bars"] = None
+                else:
+                    self.paint_bar(self.pixmaps["bars"], day)
+            if self.pixmaps["calendar"]:
+                self.paint_cell(self.pixmaps["calendar"], day)
+
+        if self.pixmaps["calendar"]:
+            self.paint_calendar_title(self.pixmaps["calendar"])
+        # The task ranking can change with any session; it is small to redraw
+        self.pixmaps["tasks"] = None
+        self.update()
+
+    def invalidate(self):
+        self.pixmaps = {"bars": None, "calendar": None, "tasks": None}
+        self.update()
+
+    def resizeEvent(self, event):
+        self.invalidate()
+        super().resizeEvent(event)
+
+    def new_pixmap(self, height):
+        pixmap = QPixmap(max(1, self.width()), height)
+        pixmap.fill(self.palette().color(self.backgroundRole()))
+        return pixmap
+
+    def paint_title(self, painter, text, width):
+        painter.setPen(self.palette().color(self.foregroundRole()))
+        painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        painter.drawText(
+            QRect(4, 0, width - 8, self.TITLE_HEIGHT),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            text,
+        )
+
+    # Daily focus bars
+
+    def bar_rect(self, day):
+        # Slot of one day's bar, oldest day on the left
+        slot = (self.width() - 8) / self.BAR_DAYS
+        index = self.BAR_DAYS - 1 - (self.drawn_today.toordinal() - day)
+        left = 4 + int(index * slot)
+        return QRect(
+            left,
+            self.TITLE_HEIGHT,
+            max(1, int(slot) - 2),
+            self.BARS_HEIGHT - self.TITLE_HEIGHT - 4,
+        )
+
+    def render_bars(self):
+        pixmap = self.new_pixmap(self.BARS_HEIGHT)
+        today = self.drawn_today.toordinal()
+        days = range(today - self.BAR_DAYS + 1, today + 1)
+        peak = max((self.chart_data.daily_focus.get(day, 0) for day in days), default=0)
+        # Round up to whole hours so small increases do not rescale the chart
+        self.bar_scale = max(60, int(-(-peak // 60)) * 60)
+
+        painter = QPainter(pixmap)
+        self.paint_title(
+            painter,
+            f"Daily focus, last {self.BAR_DAYS} days (max {self.bar_scale} min)",
+            pixmap.width(),
+        )
+        painter.end()
+
+        for day in days:
+            self.paint_bar(pixmap, day)
+        return pixmap
+
+    def paint_bar(self, pixmap, day):
+        rect = self.bar_rect(day)
+        minutes = self.chart_data.daily_focus.get(day, 0)
+        height = int(rect.height() * min(1, minutes / self.bar_scale))
+
+        painter = QPainter(pixmap)
+        painter.fillRect(rect, self.palette().color(self.backgroundRole()))
+        painter.fillRect(
+            rect.left(), rect.bottom() - height, rect.width(), height, QColor("#4a90d9")
+        )
+        painter.end()
+
+    # Streak calendar
+
+    def cell_rect(self, day):
+        # Weeks run left to right ending with the current week, Monday on top
+        today = self.drawn_today
+        weekday = date.fromordinal(day).weekday()
+        weeks_ago = (today.toordinal() - today.weekday() - (day - weekday)) // 7
+        week = self.CALENDAR_WEEKS - 1 - weeks_ago
+        return QRect(
+            4 + week * (self.CELL + 2),
+            self.TITLE_HEIGHT + weekday * (self.CELL + 2),
+            self.CELL,
+            self.CELL,
+        )
+
+    def render_calendar(self):
+        pixmap = self.new_pixmap(self.calendar_height)
+        self.paint_calendar_title(pixmap)
+
+        today = self.drawn_today
+        first = today - timedelta(days=today.weekday() + 7 * (self.CALENDAR_WEEKS - 1))
+        for offset in range((today - first).days + 1):
+            self.paint_cell(pixmap, first.toordinal() + offset)
+        return pixmap
+
+    def paint_calendar_title(self, pixmap):
+        painter = QPainter(pixmap)
+        painter.fillRect(
+            0,
+            0,
+            pixmap.width(),
+            self.TITLE_HEIGHT,
+            self.palette().color(self.backgroundRole()),
+        )
+        streak = self.chart_data.get_streak()
+        self.paint_title(
+            painter,
+            f"Focus calendar, current streak: {streak} day{'s' if streak != 1 else ''}",
+            pixmap.width(),
+        )
+        painter.end()
+
+    def paint_cell(self, pixmap, day):
+        rect = self.cell_rect(day)
+        if day > self.drawn_today.toordinal() or rect.left() < 4:
+            return  # Outside the weeks shown
+
+        minutes = self.chart_data.daily_focus.get(day, 0)
+        level = 0
+        if minutes > 0:
+            level = 1 + sum(minutes >= threshold for threshold in self.LEVELS[1:])
+
+        painter = QPainter(pixmap)
+        painter.fillRect(rect, QColor(self.LEVEL_COLORS[level]))
+        painter.end()
+
+    # Per-task breakdown
+
+    def render_tasks(self):
+        pixmap = self.new_pixmap(self.tasks_height)
+        top_tasks = self.chart_data.get_top_tasks(self.TOP_TASKS)
+
+        painter = QPainter(pixmap)
+        self.paint_title(painter, "Focus time by task (all time)", pixmap.width())
+        painter.setFont(QFont("Arial", 9))
+        label_width = min(200, pixmap.width() // 3)
+        bar_width = pixmap.width() - label_width - 80
+        peak = top_tasks[0][1] if top_tasks else 1
+
+        for i, (task, minutes) in enumerate(top_tasks):
+            top = self.TITLE_HEIGHT + i * self.TASK_ROW
+            painter.setPen(self.palette().color(self.foregroundRole()))
+            painter.drawText(
+                QRect(4, top, label_width - 8, self.TASK_ROW),
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                painter.fontMetrics().elidedText(
+                    task, Qt.TextElideMode.ElideRight, label_width - 8
+                ),
+            )
+            length = max(1, int(bar_width * minutes / peak))
+            painter.fillRect(
+                label_width, top + 3, length, self.TASK_ROW - 6, QColor("#e8a33d")
+            )
+            painter.drawText(
+                QRect(label_width + length + 4, top, 76, self.TASK_ROW),
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                f"{minutes / 60:.1f} h",
+            )
+
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        # Pixmaps are rendered lazily, so a hidden tab costs nothing
+        if self.drawn_today != date.today():
+            self.drawn_today = date.today()
+            self.pixmaps = {"bars": None, "calendar": None, "tasks": None}
+        if self.pixmaps["bars"] is None:
+            self.pixmaps["bars"] = self.render_bars()
+        if self.pixmaps["calendar"] is None:
+            self.pixmaps["calendar"] = self.render_calendar()
+        if self.pixmaps["tasks"] is None:
+            self.pixmaps["tasks"] = self.render_tasks()
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmaps["bars"])
+        painter.drawPixmap(0, self.BARS_HEIGHT, self.pixmaps["calendar"])
+        painter.drawPixmap(
+            0, self.BARS_HEIGHT + self.calendar_height, self.pixmaps["tasks"]
+        )
+        painter.end()
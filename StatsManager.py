@@ -1,17 +1,76 @@
+import time
+
+
 class StatsManager:
+    # Fields of a session history record, stored as a compact list
+    SESSION_FIELDS = ("ended_at", "minutes", "mode", "task", "completed")
+
     def __init__(self):
         self.daily_stats = {
             "focus_time": 0,
             "tasks_completed": 0,
             "pomodoros_completed": 0,
         }
+        self.session_history = []
+        self.archive_after_days = 30  # Older sessions move to the archive
+        # Called as (op, **fields) on every change, for sync and saving
+        self.change_listeners = []
+
+    def _notify(self, op_type, **fields):
+        for listener in self.change_listeners:
+            listener(op_type, **fields)
 
     def update_work_completed(self, minutes):
         self.daily_stats["focus_time"] += minutes
         self.daily_stats["pomodoros_completed"] += 1
+        self._notify("stats_inc", field="focus_time", amount=minutes)
+        self._notify("stats_inc", field="pomodoros_completed", amount=1)
 
     def task_completed(self):
         self.daily_stats["tasks_completed"] += 1
+        self._notify("stats_inc", field="tasks_completed", amount=1)
+
+    def record_session(self, minutes, mode, task="", completed=True, ended_at=None):
+        record = [ended_at or time.time(), minutes, mode, task, 1 if completed else 0]
+        self.session_history.append(record)
+        self._notify("session_add", records=[record])
+
+    def add_sessions(self, sessions):
+        # Bulk insert used by imports; records must already be validated
+        self.session_history.extend(sessions)
+        self._notify("session_add", records=list(sessions))
+
+    def compact_history(self, archive, now=None):
+        # Move cold sessions into the memory-mapped archive so the settings
+        # file and startup only deal with recent history
+        cutoff = (now or time.time()) - self.archive_after_days * 86400
+        cold = [record for record in self.session_history if record[0] < cutoff]
+        if not cold:
+            return 0
+
+        try:
+            archive.append(cold)
+        except Exception as e:
+            # Keep the sessions here; the next save retries the move
+            print(f"Error archiving session history: {str(e)}")
+            return 0
+        self.session_history = [
+            record for record in self.session_history if record[0] >= cutoff
+        ]
+        return len(cold)
+
+    def iter_sessions(self, archive=None):
+        if archive is not None:
+            yield from archive.iter_sessions()
+
+        for ended_at, minutes, mode, task, completed in self.session_history:
+            yield {
+                "ended_at": ended_at,
+                "minutes": minutes,
+                "mode": mode,
+                "task": task,
+                "completed": completed,
+            }
 
     def get_stats_text(self, current_task="None"):
         stats_text = f"""
@@ -27,10 +86,15 @@ class StatsManager:
         return stats_text
 
     def get_settings_dict(self):
-        return {"daily_stats": self.daily_stats}
+        return {
+            "daily_stats": self.daily_stats,
+            "archive_after_days": self.archive_after_days,
+        }
 
     def load_from_settings(self, settings):
         self.daily_stats = settings.get(
             "daily_stats",
             {"focus_time": 0, "tasks_completed": 0, "pomodoros_completed": 0},
         )
+        self.session_history = settings.get("session_history", [])
+        self.archive_after_days = settings.get("archive_after_days", 30)
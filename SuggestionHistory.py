@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+from collections import deque
+
+
+class SuggestionRecord:
+    __slots__ = ("time", "suggestion")
+
+    def __init__(self, time, suggestion):
+        self.time = time
+        self.suggestion = suggestion
+
+    def to_dict(self):
+        return {"time": self.time, "suggestion": self.suggestion}
+
+
+class SuggestionHistory:
+    def __init__(self, capacity=50, log_path="ai_suggestions.jsonl"):
+        # Recent suggestions stay in memory; older ones are spilled to an
+        # append-only log and read back a page at a time
+        self.recent = deque(maxlen=capacity)
+        self.log_path = log_path
+        self._lock = threading.Lock()
+
+    def append(self, time, suggestion):
+        record = SuggestionRecord(time, suggestion)
+        with self._lock:
+            if len(self.recent) == self.recent.maxlen:
+                self._spill(self.recent[0])
+            self.recent.append(record)
+
+    def _spill(self, *records):
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record.to_dict()) + "\n")
+        except Exception as e:
+            print(f"Error writing suggestion history: {str(e)}")
+
+    def flush(self):
+        # Persist everything still in memory, e.g. before the app exits
+        with self._lock:
+            self._spill(*self.recent)
+            self.recent.clear()
+
+    def __len__(self):
+        return len(self.recent)
+
+    def __iter__(self):
+        return iter(list(self.recent))
+
+    def get_recent(self):
+        # Newest first
+        with self._lock:
+            return list(reversed(self.recent))
+
+    def read_older(self, before=None, limit=20):
+        # Reads up to `limit` spilled records ending at byte offset `before`
+        # (the end of the log when None), newest first. Returns the records
+        # and the offset to pass for the next page, or 0 when exhausted.
+        try:
+            with open(self.log_path, "rb") as f:
+                end = f.seek(0, os.SEEK_END) if before is None else before
+                position = end
+                buffer = b""
+
+                # Read backwards in blocks until the page's lines are complete
+                while position > 0 and buffer.count(b"\n") <= limit:
+                    block = min(4096, position)
+                    position -= block
+                    f.seek(position)
+                    buffer = f.read(block) + buffer
+        except FileNotFoundError:
+            return [], 0
+
+        # Every record ends with a newline, so the last piece is empty and,
+        # unless we reached the start of the file, the first may be partial
+        lines = buffer.split(b"\n")[:-1]
+        if position > 0:
+            lines.pop(0)
+
+        page = lines[-limit:]
+        next_before = end - sum(len(line) + 1 for line in page)
+
+        records = []
+        for line in reversed(page):
+            data = json.loads(line)
+            records.append(SuggestionRecord(data["time"], data["suggestion"]))
+
+        return records, next_before
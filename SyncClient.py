@@ -0,0 +1,219 @@
+import json
+import threading
+import urllib.request
+import uuid
+
+
+class HttpSyncTransport:
+    def __init__(self, url, timeout=10, token=None):
+        self.url = url.rstrip("/") + "/sync"
+        self.timeout = timeout
+        self.token = token
+
+    def sync(self, device, ops, clock):
+        body = json.dumps({"device": device, "ops": ops, "clock": clock}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(self.url, data=body, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            result = json.loads(response.read())
+        return result["ack"], result["ops"]
+
+
+class SyncClient:
+    # Replicates task and stats changes between devices as an operation log.
+    # Tasks form a last-writer-wins set keyed by task text and ordered by
+    # Lamport stamps, and pomodoro progress and ordering are last-writer-wins
+    # on top of that; stats are counters built from per-device increments;
+    # session history is a grow-only set. Every op carries (device, seq), and
+    # the vector clock records the highest seq applied from each device, so a
+    # sync only transfers operations the other side has not seen.
+    def __init__(self, task_manager, stats_manager, state_path="ai_timer_sync.json"):
+        self.task_manager = task_manager
+        self.stats_manager = stats_manager
+        self.state_path = state_path
+        self.transport = None
+
+        self.device_id = uuid.uuid4().hex
+        self.seq = 0
+        self.lamport = 0
+        self.clock = {}
+        self.outbox = []  # Local ops the server has not acknowledged yet
+        self.task_stamps = {}  # task -> [lamport, device, present]
+        self.detail_stamps = {}  # task -> [lamport, device] of its last update
+        self.applying = False
+        self._lock = threading.Lock()
+
+        is_new = not self.load_state()
+        task_manager.change_listeners.append(self.on_task_change)
+        stats_manager.change_listeners.append(self.on_stats_change)
+        if is_new:
+            self.bootstrap()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading sync state: {str(e)}")
+            return False
+
+        self.device_id = state["device_id"]
+        self.seq = state["seq"]
+        self.lamport = state["lamport"]
+        self.clock = state["clock"]
+        self.outbox = state["outbox"]
+        self.task_stamps = state["task_stamps"]
+        self.detail_stamps = state.get("detail_stamps", {})
+        return True
+
+    def save_state(self):
+        with self._lock:
+            state = {
+                "device_id": self.device_id,
+                "seq": self.seq,
+                "lamport": self.lamport,
+                "clock": self.clock,
+                "outbox": self.outbox,
+                "task_stamps": self.task_stamps,
+                "detail_stamps": self.detail_stamps,
+            }
+        try:
+            with open(self.state_path, "w") as f:
+                json.dump(state, f)
+        except Exception as e:
+            print(f"Error saving sync state: {str(e)}")
+
+    def bootstrap(self):
+        # First run on this device: publish what it already has
+        for task in self.task_manager.tasks:
+            self.on_task_change("task_add", task)
+        for field, amount in self.stats_manager.daily_stats.items():
+            if amount:
+                self.on_stats_change("stats_inc", field=field, amount=amount)
+        if self.stats_manager.session_history:
+            self.on_stats_change(
+                "session_add", records=list(self.stats_manager.session_history)
+            )
+
+    def record(self, op_type, **fields):
+        with self._lock:
+            self.seq += 1
+            self.lamport += 1
+            op = {"device": self.device_id, "seq": self.seq, "type": op_type, **fields}
+            self.outbox.append(op)
+            self.clock[self.device_id] = self.seq
+        return op
+
+    def on_task_change(self, op_type, task, details=None):
+        if self.applying:
+            return
+
+        if op_type == "task_update":
+            # Kept apart from task_stamps so an update never outweighs a
+            # concurrent removal
+            stamp = [self.lamport + 1, self.device_id]
+            self.detail_stamps[task] = stamp
+            details = self.task_manager.get_details(task)
+            self.record(
+                op_type,
+                task=task,
+                stamp=stamp,
+                done=details["done"],
+                order=details["order"],
+            )
+            return
+
+        stamp = [self.lamport + 1, self.device_id, op_type == "task_add"]
+        self.task_stamps[task] = stamp
+        if op_type == "task_add":
+            details = details or self.task_manager.get_details(task)
+            self.record(
+                op_type,
+                task=task,
+                stamp=stamp[:2],
+                pomodoros=details["pomodoros"],
+                priority=details["priority"],
+                deadline=details["deadline"],
+            )
+            # Tasks can arrive with progress, e.g. from an import
+            if details["done"]:
+                self.on_task_change("task_update", task)
+        elif op_type == "task_remove":
+            self.detail_stamps.pop(task, None)
+            self.record(op_type, task=task, stamp=stamp[:2])
+
+    def on_stats_change(self, op_type, **fields):
+        if not self.applying:
+            self.record(op_type, **fields)
+
+    def exchange(self):
+        # Network round trip; safe to run off the UI thread. Returns the
+        # remote ops to hand to apply().
+        with self._lock:
+            outbox = list(self.outbox)
+            clock = dict(self.clock)
+
+        ack, remote_ops = self.transport.sync(self.device_id, outbox, clock)
+
+        with self._lock:
+            self.outbox = [op for op in self.outbox if op["seq"] > ack]
+        return remote_ops
+
+    def apply(self, ops):
+        # Must run on the thread that owns the managers
+        self.applying = True
+        try:
+            with self._lock:
+                for op in ops:
+                    device = op["device"]
+                    if op["seq"] <= self.clock.get(device, 0):
+                        continue  # Already applied
+
+                    self.apply_op(op)
+                    self.clock[device] = op["seq"]
+                    if "stamp" in op:
+                        self.lamport = max(self.lamport, op["stamp"][0])
+        finally:
+            self.applying = False
+
+    def apply_op(self, op):
+        op_type = op["type"]
+        if op_type in ("task_add", "task_remove"):
+            task = op["task"]
+            stamp = [op["stamp"][0], op["stamp"][1], op_type == "task_add"]
+            current = self.task_stamps.get(task)
+            if current and stamp[:2] <= current[:2]:
+                return  # A newer write already won
+
+            self.task_stamps[task] = stamp
+            if op_type == "task_add" and task not in self.task_manager.tasks:
+                self.task_manager.add_task(
+                    task, op["pomodoros"], op["priority"], op["deadline"]
+                )
+            elif op_type == "task_remove":
+                self.detail_stamps.pop(task, None)
+                while task in self.task_manager.tasks:
+                    self.task_manager.complete_task(task)
+
+        elif op_type == "task_update":
+            task = op["task"]
+            stamp = op["stamp"]
+            current = self.task_stamps.get(task)
+            if not current or not current[2] or stamp <= current[:2]:
+                return  # Removed, or the update predates the task being added
+            if stamp <= self.detail_stamps.get(task, [0, ""]):
+                return  # A newer update already won
+
+            self.detail_stamps[task] = stamp
+            self.task_manager.set_progress(task, op["done"], op["order"])
+
+        elif op_type == "stats_inc":
+            stats = self.stats_manager.daily_stats
+            stats[op["field"]] = stats.get(op["field"], 0) + op["amount"]
+
+        elif op_type == "session_add":
+            self.stats_manager.add_sessions(op["records"])
@@ -0,0 +1,111 @@
+import hmac
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SyncServer:
+    # Stores each device's operation log in order. Devices push their new
+    # operations and pull whatever their vector clock has not seen yet. An
+    # instance can be passed to SyncClient directly as a local stand-in for
+    # the HTTP server.
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self.device_ops = {}  # device id -> list of ops ordered by seq
+        self._lock = threading.Lock()
+
+        if log_path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._store(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def _store(self, op):
+        ops = self.device_ops.setdefault(op["device"], [])
+        # Ignore anything already stored; pushes are retried after failures
+        if op["seq"] != len(ops) + 1:
+            return False
+        ops.append(op)
+        return True
+
+    def sync(self, device, ops, clock):
+        with self._lock:
+            stored = [op for op in ops if op["device"] == device and self._store(op)]
+
+            if stored and self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    for op in stored:
+                        f.write(json.dumps(op) + "\n")
+
+            # Only operations the caller has not seen, never its own
+            missing = []
+            for other, other_ops in self.device_ops.items():
+                if other != device:
+                    missing.extend(other_ops[clock.get(other, 0) :])
+
+            ack = len(self.device_ops.get(device, []))
+
+        return ack, missing
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    server_state = None
+    token = None  # Shared secret clients send as a bearer token, if set
+
+    def do_POST(self):
+        if self.path != "/sync":
+            self.send_error(404)
+            return
+
+        if self.token and not hmac.compare_digest(
+            self.headers.get("Authorization", "").encode("utf-8"),
+            f"Bearer {self.token}".encode("utf-8"),
+        ):
+            self.send_error(401)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            ack, ops = self.server_state.sync(
+                request["device"], request["ops"], request["clock"]
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_error(400, str(e))
+            return
+
+        body = json.dumps({"ack": ack, "ops": ops}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run_server(
+    host="127.0.0.1", port=8765, log_path="ai_timer_sync_server.jsonl", token=None
+):
+    # Listens on localhost only by default; serving other devices means
+    # passing their interface as host, ideally together with a token
+    SyncRequestHandler.server_state = SyncServer(log_path)
+    SyncRequestHandler.token = token
+    httpd = ThreadingHTTPServer((host, port), SyncRequestHandler)
+    print(f"Sync server listening on {host}:{port}")
+    httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    # AI_TIMER_SYNC_TOKEN=secret python SyncServer.py [port] [host]
+    run_server(
+        host=sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1",
+        port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765,
+        token=os.environ.get("AI_TIMER_SYNC_TOKEN"),
+    )
@@ -1,34 +1,147 @@
 class TaskManager:
+    PRIORITIES = {"High": 3, "Medium": 2, "Low": 1}
+
     def __init__(self):
         self.tasks = []
         self.current_task = ""
+        # Planning details per task: estimated pomodoros, pomodoros done,
+        # priority, deadline (epoch seconds or None) and insertion order
+        self.task_details = {}
+        self.next_order = 0
+        self.version = 0  # Bumped on every change so planners can skip work
+        # Called as (op, task) on every change, for sync, planning and saving
+        self.change_listeners = []
+
+    def _notify(self, op_type, task):
+        for listener in self.change_listeners:
+            listener(op_type, task)
 
-    def add_task(self, task):
+    def add_task(self, task, pomodoros=1, priority=2, deadline=None):
         if not task:
             return False
 
         self.tasks.append(task)
+        self.task_details[task] = {
+            "pomodoros": max(1, pomodoros),
+            "done": 0,
+            "priority": priority,
+            "deadline": deadline,
+            "order": self.next_order,
+        }
+        self.next_order += 1
+        self.version += 1
+        self._notify("task_add", task)
         return True
 
+    def add_tasks(self, tasks):
+        # Bulk insert of (task, pomodoros, priority, deadline, done) tuples,
+        # applied as a single change
+        for task, pomodoros, priority, deadline, done in tasks:
+            self.tasks.append(task)
+            self.task_details[task] = {
+                "pomodoros": max(1, pomodoros),
+                "done": done,
+                "priority": priority,
+                "deadline": deadline,
+                "order": self.next_order,
+            }
+            self.next_order += 1
+            self._notify("task_add", task)
+        self.version += 1
+
+    def iter_tasks(self):
+        for task in self.tasks:
+            details = self.get_details(task)
+            yield {
+                "task": task,
+                "pomodoros": details["pomodoros"],
+                "done": details["done"],
+                "priority": details["priority"],
+                "deadline": details["deadline"],
+            }
+
     def complete_task(self, task):
         if not task or task not in self.tasks:
             return False
 
         self.tasks.remove(task)
+        if task not in self.tasks:
+            self.task_details.pop(task, None)
+        self.version += 1
+        self._notify("task_remove", task)
+        return True
+
+    def get_details(self, task):
+        details = self.task_details.get(task)
+        if details is None:
+            # Tasks saved before planning details existed
+            details = {
+                "pomodoros": 1,
+                "done": 0,
+                "priority": 2,
+                "deadline": None,
+                "order": self.next_order,
+            }
+            self.next_order += 1
+            self.task_details[task] = details
+        return details
+
+    def record_pomodoro(self, task):
+        # Returns True once the task has used up its estimate
+        if task not in self.tasks:
+            return True
+
+        details = self.get_details(task)
+        details["done"] += 1
+        self.version += 1
+        self._notify("task_update", task)
+        return details["done"] >= details["pomodoros"]
+
+    def defer_task(self, task):
+        # Move a skipped task behind others of the same urgency
+        if task not in self.tasks:
+            return False
+
+        self.get_details(task)["order"] = self.next_order
+        self.next_order += 1
+        self.version += 1
+        self._notify("task_update", task)
+        return True
+
+    def set_progress(self, task, done, order):
+        # Progress and ordering synced from another device
+        if task not in self.tasks:
+            return False
+
+        details = self.get_details(task)
+        details["done"] = done
+        details["order"] = order
+        self.next_order = max(self.next_order, order + 1)
+        self.version += 1
+        self._notify("task_update", task)
         return True
 
-    def get_task_list_text(self):
+    def get_task_list_text(self, limit=500):
         if not self.tasks:
             return "No tasks added yet."
 
-        task_text = ""
-        for i, task in enumerate(self.tasks, 1):
-            task_text += f"{i}. {task}\n"
+        # Large backlogs only show their head; the rest is counted
+        task_text = "".join(
+            f"{i}. {task}\n" for i, task in enumerate(self.tasks[:limit], 1)
+        )
+        if len(self.tasks) > limit:
+            task_text += f"... and {len(self.tasks) - limit} more tasks\n"
 
         return task_text
 
     def get_settings_dict(self):
-        return {"tasks": self.tasks}
+        # Tasks are saved incrementally by DataJournal, not with the settings
+        return {}
 
     def load_from_settings(self, settings):
         self.tasks = settings.get("tasks", [])
+        self.task_details = settings.get("task_details", {})
+        self.next_order = (
+            max((d["order"] for d in self.task_details.values()), default=-1) + 1
+        )
+        self.version += 1
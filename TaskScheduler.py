@@ -0,0 +1,158 @@
+import heapq
+from datetime import datetime, timedelta
+
+
+class TaskScheduler:
+    POMODORO_MINUTES = 25  # Task estimates are counted in 25 minute pomodoros
+
+    def __init__(self, task_manager, timer_model):
+        self.task_manager = task_manager
+        self.timer_model = timer_model
+        self.schedule = []  # (start, minutes, task, at_risk) per work slot
+        self.planned_key = None
+
+        # Tasks with work left in a heap ordered by urgency, so a replan only
+        # pops the head instead of ranking the whole backlog. Changed tasks
+        # get a new entry; the old one goes stale and is dropped when popped.
+        self.urgency = []  # (deadline, -priority, order, task)
+        self.urgency_keys = {}  # task -> its current entry in self.urgency
+        self.indexed_tasks = None  # Task list the index was built from
+        self.dirty_tasks = set()  # Changed since the index was updated
+        task_manager.change_listeners.append(self.on_task_change)
+
+    def on_task_change(self, op_type, task):
+        self.dirty_tasks.add(task)
+
+    def get_urgency_key(self, task):
+        details = self.task_manager.task_details.get(task)
+        if details is None or details["pomodoros"] - details["done"] <= 0:
+            return None
+        return (
+            details["deadline"] or float("inf"),
+            -details["priority"],
+            details["order"],
+            task,
+        )
+
+    def update_index(self):
+        tasks = self.task_manager.tasks
+        if tasks is not self.indexed_tasks:
+            # The task list was replaced, e.g. by loading settings
+            self.indexed_tasks = tasks
+            self.dirty_tasks = set(tasks)
+            self.urgency_keys = {}
+            self.urgency = []
+            for task in tasks:
+                self.task_manager.get_details(task)
+
+        added = []
+        for task in self.dirty_tasks:
+            key = self.get_urgency_key(task)
+            if key is None:
+                self.urgency_keys.pop(task, None)
+            elif self.urgency_keys.get(task) != key:
+                self.urgency_keys[task] = key
+                added.append(key)
+        self.dirty_tasks = set()
+
+        if len(self.urgency) > 2 * len(self.urgency_keys) + 1000:
+            # Mostly stale entries: start over from the live ones
+            self.urgency = list(self.urgency_keys.values())
+            heapq.heapify(self.urgency)
+        elif len(added) > len(self.urgency) // 2:
+            # Bulk changes such as a first import
+            self.urgency.extend(added)
+            heapq.heapify(self.urgency)
+        else:
+            for key in added:
+                heapq.heappush(self.urgency, key)
+
+    def get_most_urgent(self, count):
+        entries = []
+        while self.urgency and len(entries) < count:
+            entry = heapq.heappop(self.urgency)
+            if self.urgency_keys.get(entry[3]) is entry:
+                entries.append(entry)
+        for entry in entries:
+            heapq.heappush(self.urgency, entry)
+        return entries
+
+    def get_work_slots(self, now=None):
+        # Walk the active session plan from the current position until the
+        # end of the day, collecting the start time and length of work slots
+        now = now or datetime.now()
+        end_of_day = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        plan = self.timer_model.plan
+        position = self.timer_model.schedule_position
+
+        slots = []
+        start = now
+        if self.timer_model.timer_active:
+            # The running session ends after its remaining time
+            if plan.modes[position] == "Work":
+                slots.append((start, self.timer_model.remaining_time // 60))
+            start += timedelta(seconds=self.timer_model.remaining_time)
+            position = plan.next_positions[position]
+
+        while start < end_of_day:
+            seconds = plan.durations[position]
+            if plan.modes[position] == "Work":
+                slots.append((start, seconds // 60))
+            start += timedelta(seconds=seconds)
+            position = plan.next_positions[position]
+
+        return slots
+
+    def replan(self, now=None, force=False):
+        # The plan only depends on the task list, the timer's position and
+        # the current minute
+        now = (now or datetime.now()).replace(second=0, microsecond=0)
+        key = (
+            now,
+            self.task_manager.version,
+            id(self.timer_model.plan),
+            self.timer_model.schedule_position,
+            self.timer_model.timer_active,
+        )
+        if key == self.planned_key and not force:
+            return self.schedule
+
+        slots = self.get_work_slots(now)
+        self.update_index()
+
+        # Most urgent first: earliest deadline, then highest priority, then
+        # the order tasks were added in. Every task takes at least one slot,
+        # so only the head of the index can make it into the plan.
+        # First-fit: each task fills the earliest free slots until the work
+        # it still needs is covered
+        schedule = []
+        slot_index = 0
+        for deadline, _, _, task in self.get_most_urgent(len(slots)):
+            details = self.task_manager.task_details[task]
+            needed = (details["pomodoros"] - details["done"]) * self.POMODORO_MINUTES
+            while needed > 0 and slot_index < len(slots):
+                start, minutes = slots[slot_index]
+                at_risk = start.timestamp() + minutes * 60 > deadline
+                schedule.append((start, minutes, task, at_risk))
+                needed -= minutes
+                slot_index += 1
+
+        self.schedule = schedule
+        self.planned_key = key
+        return schedule
+
+    def get_current_task(self):
+        schedule = self.replan()
+        return schedule[0][2] if schedule else ""
+
+    def get_plan_text(self):
+        schedule = self.replan()
+        if not schedule:
+            return "No work sessions left to plan today."
+
+        plan_text = "Today's plan:\n"
+        for start, minutes, task, at_risk in schedule:
+            warning = "  (misses deadline)" if at_risk else ""
+            plan_text += f"{start.strftime('%H:%M')}  {minutes} min  {task}{warning}\n"
+
+        return plan_text
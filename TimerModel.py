@@ -1,3 +1,7 @@
+import time
+from SessionPlan import SessionPlanRegistry
+
+
 class TimerModel:
     def __init__(self):
         # Timer variables
@@ -10,21 +14,35 @@ class TimerModel:
         self.break_time = "5"
         self.mode_index = 0  # Default to Pomodoro mode
 
+        # Session plans and the position within the active plan's schedule
+        self.plan_registry = SessionPlanRegistry()
+        self.plan = self.plan_registry.get("Pomodoro (25/5)")
+        self.schedule_position = 0
+        self.session_duration = 0  # Length of the running session in seconds
+
+    def set_custom_times(self, work_time, break_time):
+        self.work_time = work_time
+        self.break_time = break_time
+        return self.plan_registry.set_custom_times(work_time, break_time)
+
+    def select_plan(self, mode):
+        plan = self.plan_registry.get(mode)
+        if plan is None:
+            return None
+
+        if plan is not self.plan:
+            self.plan = plan
+            self.schedule_position = plan.position_for_mode(
+                self.schedule_position, self.current_mode
+            )
+        return plan
+
     def start_timer(self, mode, current_mode):
-        if mode == "Custom":
-            try:
-                if current_mode == "Work":
-                    minutes = int(self.work_time)
-                else:
-                    minutes = int(self.break_time)
-            except ValueError:
-                return None, "Invalid Time"
-        elif mode == "Pomodoro (25/5)":
-            minutes = 25 if current_mode == "Work" else 5
-        elif mode == "Long Focus (50/10)":
-            minutes = 50 if current_mode == "Work" else 10
-
-        self.remaining_time = minutes * 60
+        if self.select_plan(mode) is None:
+            return None, "Invalid Time"
+
+        self.remaining_time = self.plan.durations[self.schedule_position]
+        self.session_duration = self.remaining_time
         self.timer_active = True
         self.timer_paused = False
 
@@ -49,7 +67,9 @@ class TimerModel:
         return True
 
     def toggle_mode(self):
-        self.current_mode = "Break" if self.current_mode == "Work" else "Work"
+        # Advance to the next step of the plan's schedule
+        self.schedule_position = self.plan.next_positions[self.schedule_position]
+        self.current_mode = self.plan.modes[self.schedule_position]
         return self.current_mode
 
     def update_countdown(self):
@@ -60,20 +80,29 @@ class TimerModel:
         return False
 
     def get_next_timer_duration(self, mode):
-        if mode == "Custom":
-            try:
-                if self.current_mode == "Work":
-                    minutes = int(self.work_time)
-                else:
-                    minutes = int(self.break_time)
-            except ValueError:
-                minutes = 25 if self.current_mode == "Work" else 5
-        elif mode == "Pomodoro (25/5)":
-            minutes = 25 if self.current_mode == "Work" else 5
-        elif mode == "Long Focus (50/10)":
-            minutes = 50 if self.current_mode == "Work" else 10
-
-        return minutes * 60
+        if self.select_plan(mode) is None:
+            # Fall back to the default plan when custom times are invalid
+            self.select_plan("Pomodoro (25/5)")
+
+        return self.plan.durations[self.schedule_position]
+
+    def restore_session(self, state, now=None):
+        # Resume from a checkpoint, counting the wall time that passed while
+        # the app was not running
+        self.current_mode = state["current_mode"]
+        if state["schedule_position"] < len(self.plan):
+            self.schedule_position = state["schedule_position"]
+        else:
+            self.schedule_position = self.plan.position_for_mode(0, self.current_mode)
+        self.session_duration = state["session_duration"]
+        self.timer_active = state["timer_active"]
+        self.timer_paused = state["timer_paused"]
+
+        if self.timer_active and not self.timer_paused:
+            now = now or time.time()
+            self.remaining_time = max(0, int(round(state["deadline"] - now)))
+        else:
+            self.remaining_time = state["remaining_time"]
 
     def get_settings_dict(self):
         return {
@@ -81,10 +110,13 @@ class TimerModel:
             "work_time": self.work_time,
             "break_time": self.break_time,
             "mode_index": self.mode_index,
+            "session_plans": self.plan_registry.get_user_plans(),
         }
 
     def load_from_settings(self, settings):
         self.pomodoro_count = settings.get("pomodoro_count", 0)
-        self.work_time = settings.get("work_time", "25")
-        self.break_time = settings.get("break_time", "5")
+        self.set_custom_times(
+            settings.get("work_time", "25"), settings.get("break_time", "5")
+        )
         self.mode_index = settings.get("mode_index", 0)
+        self.plan_registry.load_user_plans(settings.get("session_plans", []))
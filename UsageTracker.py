@@ -0,0 +1,155 @@
+import threading
+from datetime import date
+
+
+class BudgetExceededError(Exception):
+    pass
+
+
+class UsageTracker:
+    def __init__(self, daily_token_budget=0):
+        self.daily_token_budget = daily_token_budget  # 0 means unlimited
+        self.usage_date = date.today().isoformat()
+        self.tokens_today = 0
+        self.methods = {}
+        self._lock = threading.Lock()
+
+    def _method_stats(self, method):
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "errors": 0,
+                "cache_hits": 0,
+                "prompt_tokens": 0,
+                "estimated_prompt_tokens": 0,
+                "completion_tokens": 0,
+                "latency_total": 0.0,
+                "latency_max": 0.0,
+            }
+            self.methods[method] = stats
+        return stats
+
+    def _roll_day(self):
+        today = date.today().isoformat()
+        if today != self.usage_date:
+            self.usage_date = today
+            self.tokens_today = 0
+
+    def check_budget(self, estimated_tokens=0):
+        with self._lock:
+            self._roll_day()
+            if not self.daily_token_budget:
+                return
+            if self.tokens_today + estimated_tokens > self.daily_token_budget:
+                raise BudgetExceededError(
+                    f"Daily token budget of {self.daily_token_budget} reached "
+                    f"({self.tokens_today} used today)"
+                )
+
+    def record_call(self, method, latency, usage=None):
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        with self._lock:
+            self._roll_day()
+            stats = self._method_stats(method)
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+            self.tokens_today += prompt_tokens + completion_tokens
+
+    def record_estimate(self, method, prompt_tokens):
+        # Estimated before sending, so oversized prompts show up even when
+        # the call fails
+        with self._lock:
+            self._method_stats(method)["estimated_prompt_tokens"] += prompt_tokens
+
+    def record_error(self, method, latency):
+        with self._lock:
+            stats = self._method_stats(method)
+            stats["errors"] += 1
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+
+    def record_cache_hit(self, method):
+        with self._lock:
+            self._method_stats(method)["cache_hits"] += 1
+
+    def get_usage_text(self):
+        with self._lock:
+            self._roll_day()
+            budget = self.daily_token_budget or "unlimited"
+            usage_text = f"Tokens used today: {self.tokens_today} (budget: {budget})\n\n"
+
+            if not self.methods:
+                return usage_text + "No AI calls made yet."
+
+            for method, stats in sorted(self.methods.items()):
+                requests = stats["calls"] + stats["errors"]
+                avg_latency = stats["latency_total"] / requests if requests else 0
+                usage_text += (
+                    f"{method}:\n"
+                    f"  Calls: {stats['calls']}  Errors: {stats['errors']}  "
+                    f"Cache hits: {stats['cache_hits']}\n"
+                    f"  Tokens: {stats['prompt_tokens']} prompt "
+                    f"(~{stats['estimated_prompt_tokens']} estimated) / "
+                    f"{stats['completion_tokens']} completion\n"
+                    f"  Latency: {avg_latency:.2f}s avg / {stats['latency_max']:.2f}s max\n"
+                )
+
+            return usage_text
+
+    def get_prometheus_text(self):
+        metrics = [
+            ("calls", "ai_requests_total", "counter", "Successful AI requests"),
+            ("errors", "ai_request_errors_total", "counter", "Failed AI requests"),
+            ("cache_hits", "ai_cache_hits_total", "counter", "AI requests served without a call"),
+            ("prompt_tokens", "ai_prompt_tokens_total", "counter", "Prompt tokens sent"),
+            ("estimated_prompt_tokens", "ai_estimated_prompt_tokens_total", "counter", "Prompt tokens estimated before sending"),
+            ("completion_tokens", "ai_completion_tokens_total", "counter", "Completion tokens received"),
+            ("latency_total", "ai_request_latency_seconds_total", "counter", "Total AI request latency"),
+            ("latency_max", "ai_request_latency_seconds_max", "gauge", "Slowest AI request"),
+        ]
+
+        with self._lock:
+            self._roll_day()
+            lines = []
+            for key, name, metric_type, help_text in metrics:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for method, stats in sorted(self.methods.items()):
+                    lines.append(f'{name}{{method="{method}"}} {stats[key]}')
+
+            lines.append("# HELP ai_tokens_today Tokens used since midnight")
+            lines.append("# TYPE ai_tokens_today gauge")
+            lines.append(f"ai_tokens_today {self.tokens_today}")
+            lines.append("# HELP ai_daily_token_budget Daily token budget, 0 if unlimited")
+            lines.append("# TYPE ai_daily_token_budget gauge")
+            lines.append(f"ai_daily_token_budget {self.daily_token_budget}")
+
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path="ai_usage_metrics.prom"):
+        try:
+            with open(path, "w") as f:
+                f.write(self.get_prometheus_text())
+            return True
+        except Exception as e:
+            print(f"Error exporting usage metrics: {str(e)}")
+            return False
+
+    def get_settings_dict(self):
+        return {
+            "daily_token_budget": self.daily_token_budget,
+            "token_usage": {"date": self.usage_date, "tokens": self.tokens_today},
+        }
+
+    def load_from_settings(self, settings):
+        self.daily_token_budget = settings.get("daily_token_budget", 0)
+        token_usage = settings.get("token_usage", {})
+        self.usage_date = token_usage.get("date", date.today().isoformat())
+        self.tokens_today = token_usage.get("tokens", 0)
+        self._roll_day()
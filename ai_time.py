@@ -1,7 +1,9 @@
+import os
 import sys
 import threading
 import pygame
 import random
+from datetime import date, datetime
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -14,21 +16,46 @@ from PyQt6.QtWidgets import (
     QWidget,
     QTabWidget,
     QComboBox,
+    QSpinBox,
     QProgressBar,
     QMessageBox,
     QSystemTrayIcon,
     QMenu,
+    QFileDialog,
+    QScrollArea,
+    QSplitter,
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QIcon, QFont, QAction
 from AIAssistant import AIAssistant
+from ChartData import ChartData
+from DataJournal import DataJournal
+from DataTransfer import DataTransfer
+from ProductivityAnalytics import ProductivityAnalytics
+from StatsCharts import StatsCharts
 from StatsManager import StatsManager
 from TaskManager import TaskManager
+from TaskScheduler import TaskScheduler
 from TimerModel import TimerModel
 from SettingsManager import SettingsManager
+from SessionCheckpoint import SessionCheckpoint
+from SessionArchive import SessionArchive
+from StallWatchdog import StallWatchdog
+from HandlerProfiler import profiled, profiler
+from SyncClient import HttpSyncTransport, SyncClient
 
 
 class AITimer(QMainWindow):
+    # Carries (generation, text) from AI worker threads to the UI thread
+    ai_text_ready = pyqtSignal(int, str)
+    # Carry (kind, batch), percent done and a final message from import and
+    # export threads
+    transfer_batch_ready = pyqtSignal(str, object)
+    transfer_progress = pyqtSignal(int)
+    transfer_finished = pyqtSignal(str)
+    # Carries operations fetched from the sync server to the UI thread
+    sync_ops_ready = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AI Productivity Timer")
@@ -39,6 +66,12 @@ class AITimer(QMainWindow):
         self.task_manager = TaskManager()
         self.stats_manager = StatsManager()
         self.ai_assistant = AIAssistant()
+        self.task_scheduler = TaskScheduler(self.task_manager, self.timer_model)
+        self.session_archive = SessionArchive()
+        self.analytics = ProductivityAnalytics(self.stats_manager, self.session_archive)
+        # Tasks and history are saved incrementally, outside the settings file
+        self.data_journal = DataJournal(self.task_manager, self.stats_manager)
+        self.is_shut_down = False
 
         # Initialize pygame for sounds
         pygame.mixer.init()
@@ -49,13 +82,42 @@ class AITimer(QMainWindow):
         # Create system tray icon
         self.setup_system_tray()
 
+        # AI responses are applied on the UI thread, newest session only
+        self.ai_text_ready.connect(self.show_ai_text)
+        self.transfer_batch_ready.connect(self.apply_import_batch)
+        self.transfer_progress.connect(self.transfer_progress_bar.setValue)
+        self.transfer_finished.connect(self.finish_transfer)
+        self.transfer_thread = None
+        self.sync_ops_ready.connect(self.apply_sync_ops)
+        self.sync_thread = None
+        self.sync_client = None
+
         # Set up timers
         self.countdown_timer = QTimer()
         self.countdown_timer.timeout.connect(self.update_countdown)
 
+        # Reports ticks that arrive late because the UI thread was blocked
+        self.watchdog = StallWatchdog()
+        self.watchdog.start()
+
         # Load saved settings if available
         self.load_settings()
 
+        # Pick up a session that was running when the app last exited
+        self.checkpoint = SessionCheckpoint()
+        self.restore_session()
+
+        # Multi-device sync is opt-in, e.g.
+        # AI_TIMER_SYNC_URL=http://server:8765 python ai_time.py
+        # with AI_TIMER_SYNC_TOKEN set when the server requires a token
+        sync_url = os.environ.get("AI_TIMER_SYNC_URL")
+        if sync_url:
+            self.sync_client = SyncClient(self.task_manager, self.stats_manager)
+            self.sync_client.transport = HttpSyncTransport(
+                sync_url, token=os.environ.get("AI_TIMER_SYNC_TOKEN")
+            )
+            self.start_sync()
+
     def setup_ui(self):
         # Main widget and layout
         central_widget = QWidget()
@@ -133,7 +195,7 @@ class AITimer(QMainWindow):
 
         mode_label = QLabel("Mode:")
         self.mode_selector = QComboBox()
-        self.mode_selector.addItems(["Pomodoro (25/5)", "Long Focus (50/10)", "Custom"])
+        self.mode_selector.addItems(self.timer_model.plan_registry.names())
 
         self.work_time_input = QLineEdit("25")
         self.work_time_input.setMaximumWidth(50)
@@ -157,15 +219,15 @@ class AITimer(QMainWindow):
         self.ai_text = QTextEdit()
         self.ai_text.setReadOnly(True)
         self.ai_text.setPlaceholderText(
-            "AI suggestions will appear here once you validate your API key and start working."
+            "Suggestions will appear here once you start working. Validate your API key for AI-generated tips."
         )
         timer_layout.addWidget(self.ai_text)
 
         # AI Controls
         ai_controls = QHBoxLayout()
         self.get_suggestion_btn = QPushButton("Get Productivity Tip")
-        self.get_suggestion_btn.clicked.connect(self.get_ai_suggestion)
-        self.get_suggestion_btn.setEnabled(False)
+        # Local tips work without an API key
+        self.get_suggestion_btn.clicked.connect(self.request_ai_suggestion)
 
         self.analyze_btn = QPushButton("Analyze My Productivity")
         self.analyze_btn.clicked.connect(self.analyze_productivity)
@@ -190,7 +252,20 @@ class AITimer(QMainWindow):
         self.add_task_btn = QPushButton("Add Task")
         self.add_task_btn.clicked.connect(self.add_task)
 
+        # Planning details for the scheduler
+        self.task_estimate_input = QSpinBox()
+        self.task_estimate_input.setRange(1, 20)
+        self.task_estimate_input.setSuffix(" pomodoros")
+        self.task_priority_selector = QComboBox()
+        self.task_priority_selector.addItems(list(TaskManager.PRIORITIES))
+        self.task_priority_selector.setCurrentText("Medium")
+        self.task_deadline_input = QLineEdit()
+        self.task_deadline_input.setPlaceholderText("Deadline (HH:MM or YYYY-MM-DD HH:MM)")
+
         add_task_layout.addWidget(self.new_task_input)
+        add_task_layout.addWidget(self.task_estimate_input)
+        add_task_layout.addWidget(self.task_priority_selector)
+        add_task_layout.addWidget(self.task_deadline_input)
         add_task_layout.addWidget(self.add_task_btn)
         tasks_layout.addLayout(add_task_layout)
 
@@ -214,6 +289,16 @@ class AITimer(QMainWindow):
         self.task_list.setReadOnly(True)
         tasks_layout.addWidget(self.task_list)
 
+        # Bulk import/export
+        task_transfer_layout = QHBoxLayout()
+        self.import_tasks_btn = QPushButton("Import Tasks...")
+        self.import_tasks_btn.clicked.connect(lambda: self.import_data("tasks"))
+        self.export_tasks_btn = QPushButton("Export Tasks...")
+        self.export_tasks_btn.clicked.connect(lambda: self.export_data("tasks"))
+        task_transfer_layout.addWidget(self.import_tasks_btn)
+        task_transfer_layout.addWidget(self.export_tasks_btn)
+        tasks_layout.addLayout(task_transfer_layout)
+
         # Tab 3: Statistics
         stats_tab = QWidget()
         stats_layout = QVBoxLayout(stats_tab)
@@ -222,19 +307,108 @@ class AITimer(QMainWindow):
         self.stats_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
         stats_layout.addWidget(self.stats_label)
 
+        # Long-range report period
+        period_layout = QHBoxLayout()
+        period_layout.addWidget(QLabel("Report:"))
+        self.report_period_selector = QComboBox()
+        self.report_period_selector.addItems(["This Week", "This Month"])
+        self.report_period_selector.currentIndexChanged.connect(
+            self.update_stats_display
+        )
+        period_layout.addWidget(self.report_period_selector)
+        period_layout.addStretch()
+        stats_layout.addLayout(period_layout)
+
+        # Charts above the text report; the splitter lets either grow
+        self.stats_charts = StatsCharts(
+            ChartData(self.stats_manager, self.session_archive)
+        )
+        charts_scroll = QScrollArea()
+        charts_scroll.setWidgetResizable(True)
+        charts_scroll.setWidget(self.stats_charts)
+
         self.stats_display = QTextEdit()
         self.stats_display.setReadOnly(True)
-        stats_layout.addWidget(self.stats_display)
+
+        stats_splitter = QSplitter(Qt.Orientation.Vertical)
+        stats_splitter.addWidget(charts_scroll)
+        stats_splitter.addWidget(self.stats_display)
+        stats_layout.addWidget(stats_splitter)
 
         self.ai_insights_btn = QPushButton("Get AI Insights on Your Productivity")
         self.ai_insights_btn.clicked.connect(self.get_ai_insights)
         self.ai_insights_btn.setEnabled(False)
         stats_layout.addWidget(self.ai_insights_btn)
 
+        history_transfer_layout = QHBoxLayout()
+        self.import_history_btn = QPushButton("Import History...")
+        self.import_history_btn.clicked.connect(lambda: self.import_data("sessions"))
+        self.export_history_btn = QPushButton("Export History...")
+        self.export_history_btn.clicked.connect(lambda: self.export_data("sessions"))
+        history_transfer_layout.addWidget(self.import_history_btn)
+        history_transfer_layout.addWidget(self.export_history_btn)
+        stats_layout.addLayout(history_transfer_layout)
+
+        # Tab 4: AI Usage
+        usage_tab = QWidget()
+        usage_layout = QVBoxLayout(usage_tab)
+
+        self.usage_label = QLabel("AI Usage")
+        self.usage_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        usage_layout.addWidget(self.usage_label)
+
+        self.usage_display = QTextEdit()
+        self.usage_display.setReadOnly(True)
+        usage_layout.addWidget(self.usage_display)
+
+        usage_controls = QHBoxLayout()
+        usage_controls.addWidget(QLabel("Daily token budget (0 = unlimited):"))
+        self.token_budget_input = QLineEdit("0")
+        self.token_budget_input.setMaximumWidth(100)
+        self.token_budget_input.editingFinished.connect(self.update_token_budget)
+        usage_controls.addWidget(self.token_budget_input)
+
+        self.refresh_usage_btn = QPushButton("Refresh")
+        self.refresh_usage_btn.clicked.connect(self.update_usage_display)
+        self.export_usage_btn = QPushButton("Export Metrics")
+        self.export_usage_btn.clicked.connect(self.export_usage_metrics)
+        usage_controls.addWidget(self.refresh_usage_btn)
+        usage_controls.addWidget(self.export_usage_btn)
+        usage_layout.addLayout(usage_controls)
+
+        # Import/export progress, shown only while a transfer runs
+        self.transfer_progress_bar = QProgressBar()
+        self.transfer_progress_bar.setRange(0, 100)
+        self.transfer_progress_bar.setMaximumWidth(200)
+        self.transfer_progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.transfer_progress_bar)
+
+        # Tab 5: Suggestion History
+        history_tab = QWidget()
+        history_layout = QVBoxLayout(history_tab)
+
+        self.history_label = QLabel("Suggestion History")
+        self.history_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        history_layout.addWidget(self.history_label)
+
+        self.history_display = QTextEdit()
+        self.history_display.setReadOnly(True)
+        history_layout.addWidget(self.history_display)
+
+        self.load_older_btn = QPushButton("Load Older")
+        self.load_older_btn.clicked.connect(self.load_older_suggestions)
+        history_layout.addWidget(self.load_older_btn)
+
         # Add tabs to tab widget
+        self.tabs = tabs
+        self.usage_tab = usage_tab
+        self.history_tab = history_tab
         tabs.addTab(timer_tab, "Timer")
         tabs.addTab(tasks_tab, "Tasks")
         tabs.addTab(stats_tab, "Statistics")
+        tabs.addTab(usage_tab, "AI Usage")
+        tabs.addTab(history_tab, "History")
+        tabs.currentChanged.connect(self.on_tab_changed)
 
         # Update stats display
         self.update_stats_display()
@@ -257,12 +431,31 @@ class AITimer(QMainWindow):
         quit_action = QAction("Quit", self)
         quit_action.triggered.connect(QApplication.quit)
 
+        profile_action = QAction("Profiling", self)
+        profile_action.setCheckable(True)
+        profile_action.setChecked(profiler.enabled)
+        profile_action.toggled.connect(self.toggle_profiling)
+
         tray_menu.addAction(show_action)
+        tray_menu.addAction(profile_action)
         tray_menu.addAction(quit_action)
 
         self.tray_icon.setContextMenu(tray_menu)
         self.tray_icon.show()
 
+    def toggle_profiling(self, enabled):
+        if enabled:
+            profiler.enable()
+        else:
+            # Stopping writes the report to ai_timer_profile.txt
+            profiler.disable()
+            self.tray_icon.showMessage(
+                "Profiling Stopped",
+                "Profile written to ai_timer_profile.txt",
+                QSystemTrayIcon.MessageIcon.Information,
+                3000,
+            )
+
     def validate_api_key(self):
         key = self.api_key_input.text().strip()
         success, message = self.ai_assistant.validate_api_key(key, model_type="gemini", 
@@ -270,7 +463,6 @@ class AITimer(QMainWindow):
 
         if success:
             QMessageBox.information(self, "Success", message)
-            self.get_suggestion_btn.setEnabled(True)
             self.analyze_btn.setEnabled(True)
             self.ai_task_btn.setEnabled(True)
             self.ai_insights_btn.setEnabled(True)
@@ -285,18 +477,39 @@ class AITimer(QMainWindow):
         else:
             QMessageBox.warning(self, "Validation Failed", message)
 
+    def start_countdown(self):
+        self.countdown_timer.start(1000)
+        self.watchdog.arm()
+
+    def stop_countdown(self):
+        self.countdown_timer.stop()
+        self.watchdog.disarm()
+
+    @pyqtSlot()
+    @profiled("AITimer.start_timer")
     def start_timer(self):
         if self.timer_model.timer_active and self.timer_model.timer_paused:
             # Resume timer
-            self.countdown_timer.start(1000)
+            self.start_countdown()
             self.timer_model.timer_paused = False
             self.pause_button.setText("Pause")
+            self.checkpoint.save(self.timer_model, self.task_manager.current_task)
         else:
-            # Start new timer
+            # Start new timer, taking the planned task if none is set
+            if not self.task_input.text() and self.timer_model.current_mode == "Work":
+                self.task_input.setText(self.task_scheduler.get_current_task())
             self.task_manager.current_task = self.task_input.text()
 
-            # Set timer duration based on selected mode
+            # Anything still pending from the previous session is superseded
+            self.ai_assistant.coalescer.next_generation()
+
+            # Set timer duration based on selected mode. The index goes into
+            # the checkpoint, so it must match the plan actually started.
             mode = self.mode_selector.currentText()
+            self.timer_model.mode_index = self.mode_selector.currentIndex()
+            self.timer_model.set_custom_times(
+                self.work_time_input.text(), self.break_time_input.text()
+            )
 
             remaining_time, error = self.timer_model.start_timer(
                 mode, self.timer_model.current_mode
@@ -312,17 +525,16 @@ class AITimer(QMainWindow):
             self.progress_bar.setValue(self.timer_model.remaining_time)
 
             # Start timer
-            self.countdown_timer.start(1000)
+            self.start_countdown()
             self.start_button.setText("Reset")
             self.pause_button.setEnabled(True)
             self.skip_button.setEnabled(True)
+            self.update_task_list()
+            self.checkpoint.save(self.timer_model, self.task_manager.current_task)
 
-            # Get AI suggestion if API key is valid
-            if (
-                self.ai_assistant.is_api_key_valid
-                and self.timer_model.current_mode == "Work"
-            ):
-                threading.Thread(target=self.get_ai_suggestion).start()
+            # Show a local tip right away, refined by the AI if available
+            if self.timer_model.current_mode == "Work":
+                self.request_ai_suggestion()
 
     def pause_timer(self):
         if not self.timer_model.timer_active:
@@ -332,20 +544,37 @@ class AITimer(QMainWindow):
 
         if is_paused:
             # Pause timer
-            self.countdown_timer.stop()
+            self.stop_countdown()
             self.pause_button.setText("Resume")
         else:
             # Resume timer
-            self.countdown_timer.start(1000)
+            self.start_countdown()
             self.pause_button.setText("Pause")
 
+        self.checkpoint.save(self.timer_model, self.task_manager.current_task)
+
     def skip_timer(self):
         if not self.timer_model.timer_active:
             return
 
+        skipped_work = self.timer_model.current_mode == "Work"
+        self.stats_manager.record_session(
+            (self.timer_model.session_duration - self.timer_model.remaining_time) // 60,
+            self.timer_model.current_mode,
+            self.task_manager.current_task,
+            completed=False,
+        )
         success = self.timer_model.skip_timer()
         if success:
-            self.countdown_timer.stop()
+            self.stop_countdown()
+            self.ai_assistant.coalescer.next_generation()
+
+            # A skipped task goes behind others of the same urgency
+            if skipped_work and self.task_manager.current_task:
+                self.task_manager.defer_task(self.task_manager.current_task)
+                self.task_input.clear()
+                self.task_manager.current_task = ""
+            self.update_task_list()
 
             # Update UI
             self.mode_label.setText(f"{self.timer_model.current_mode} Mode")
@@ -361,8 +590,10 @@ class AITimer(QMainWindow):
 
             # Update time display for the next timer
             self.update_time_display_for_next_timer()
+            self.checkpoint.save(self.timer_model, self.task_manager.current_task)
 
     def update_countdown(self):
+        self.watchdog.tick()
         timer_complete = self.timer_model.update_countdown()
 
         if timer_complete:
@@ -372,6 +603,10 @@ class AITimer(QMainWindow):
         self.update_time_display()
         self.progress_bar.setValue(self.timer_model.remaining_time)
 
+        # Refresh the checkpoint once a minute
+        if self.timer_model.remaining_time % 60 == 0:
+            self.checkpoint.save(self.timer_model, self.task_manager.current_task)
+
         # Get AI suggestion randomly during work sessions (5% chance each minute)
         if (
             self.ai_assistant.is_api_key_valid
@@ -379,34 +614,42 @@ class AITimer(QMainWindow):
             and self.timer_model.remaining_time % 60 == 0
         ):
             if self.timer_model.remaining_time > 0 and random.random() < 0.05:
-                threading.Thread(target=self.get_ai_suggestion).start()
+                threading.Thread(
+                    target=self.get_ai_suggestion,
+                    args=(self.ai_assistant.coalescer.generation,),
+                ).start()
 
+    @profiled("AITimer.timer_complete")
     def timer_complete(self):
-        self.countdown_timer.stop()
+        self.stop_countdown()
         self.timer_model.timer_active = False
+        self.ai_assistant.coalescer.next_generation()
 
         # Play sound
         self.play_timer_complete_sound()
 
         # Update stats
+        self.stats_manager.record_session(
+            self.timer_model.session_duration // 60,
+            self.timer_model.current_mode,
+            self.task_manager.current_task,
+        )
+
         if self.timer_model.current_mode == "Work":
-            mode = self.mode_selector.currentText()
-            if mode == "Custom":
-                try:
-                    minutes = int(self.timer_model.work_time)
-                except ValueError:
-                    minutes = 25
-            elif mode == "Pomodoro (25/5)":
-                minutes = 25
-            elif mode == "Long Focus (50/10)":
-                minutes = 50
+            minutes = self.timer_model.session_duration // 60
 
             self.stats_manager.update_work_completed(minutes)
             self.timer_model.pomodoro_count += 1
 
-            # Mark task as completed if there is one
+            # Mark task as completed once its estimate is used up
             if self.task_manager.current_task:
-                self.complete_current_task()
+                if self.task_manager.record_pomodoro(self.task_manager.current_task):
+                    self.complete_current_task()
+                else:
+                    # Let the planner pick the next session's task
+                    self.task_input.clear()
+                    self.task_manager.current_task = ""
+                    self.update_task_list()
 
         # Show notification
         mode_text = (
@@ -435,18 +678,17 @@ class AITimer(QMainWindow):
         # Update time display for the next timer
         self.update_time_display_for_next_timer()
 
-        # Update stats display
+        # Update stats display and the day's plan
         self.update_stats_display()
+        self.update_task_list()
 
-        # Get AI suggestion after completing work session
-        if (
-            self.ai_assistant.is_api_key_valid
-            and self.timer_model.current_mode == "Break"
-        ):
-            threading.Thread(target=self.get_break_suggestion).start()
+        # Get break suggestion after completing work session
+        if self.timer_model.current_mode == "Break":
+            self.request_break_suggestion()
 
         # Save settings
         self.save_settings()
+        self.checkpoint.save(self.timer_model, self.task_manager.current_task)
 
     def play_timer_complete_sound(self):
         try:
@@ -468,34 +710,65 @@ class AITimer(QMainWindow):
         self.progress_bar.setMaximum(self.timer_model.remaining_time)
         self.progress_bar.setValue(self.timer_model.remaining_time)
 
-    def get_ai_suggestion(self):
+    def show_ai_text(self, generation, text):
+        # Drop responses that belong to a session that has since changed
+        if self.ai_assistant.coalescer.is_current(generation):
+            self.ai_text.setText(text)
+
+    def request_ai_suggestion(self):
+        # The local tip answers instantly and works without an API key
+        self.ai_text.setText(
+            self.ai_assistant.local_engine.get_productivity_tip(
+                self.stats_manager.daily_stats
+            )
+        )
+
+        if self.ai_assistant.is_api_key_valid:
+            threading.Thread(
+                target=self.get_ai_suggestion,
+                args=(self.ai_assistant.coalescer.generation,),
+            ).start()
+
+    def request_break_suggestion(self):
+        self.ai_text.setText(
+            self.ai_assistant.local_engine.get_break_activity(
+                self.stats_manager.daily_stats["focus_time"],
+                self.timer_model.remaining_time // 60,
+            )
+        )
+
+        if self.ai_assistant.is_api_key_valid:
+            threading.Thread(
+                target=self.get_break_suggestion,
+                args=(self.ai_assistant.coalescer.generation,),
+            ).start()
+
+    def get_ai_suggestion(self, generation):
+        # The generation is read on the UI thread when the request is made,
+        # so a mode change before the thread starts still supersedes it
         if not self.ai_assistant.is_api_key_valid:
             return
 
-        self.ai_text.clear()
-        self.ai_text.setPlaceholderText("Getting AI suggestion...")
-
         suggestion, error = self.ai_assistant.get_productivity_suggestion(
-            self.task_manager.current_task, self.stats_manager.daily_stats
+            self.task_manager.current_task,
+            self.stats_manager.daily_stats,
+            generation=generation,
         )
 
+        # On failure the local tip already on screen stays in place
         if suggestion:
-            self.ai_text.setText(suggestion)
-        else:
-            self.ai_text.setText(error)
+            self.ai_text_ready.emit(generation, suggestion)
 
-    def get_break_suggestion(self):
+    def get_break_suggestion(self, generation):
         if not self.ai_assistant.is_api_key_valid:
             return
 
         suggestion, error = self.ai_assistant.get_break_suggestion(
-            self.stats_manager.daily_stats["focus_time"]
+            self.stats_manager.daily_stats["focus_time"], generation=generation
         )
 
         if suggestion:
-            self.ai_text.setText(suggestion)
-        else:
-            self.ai_text.setText(error)
+            self.ai_text_ready.emit(generation, suggestion)
 
     def analyze_productivity(self):
         if not self.ai_assistant.is_api_key_valid:
@@ -508,6 +781,9 @@ class AITimer(QMainWindow):
             self.stats_manager.daily_stats,
             self.task_manager.current_task,
             self.task_manager.tasks,
+            history_summary=self.analytics.get_report_text("week"),
+            task_details=self.task_manager.task_details,
+            tasks_version=self.task_manager.version,
         )
 
         if analysis:
@@ -515,12 +791,38 @@ class AITimer(QMainWindow):
         else:
             self.ai_text.setText(error)
 
+    def parse_deadline(self, text):
+        if not text:
+            return None, None
+
+        for fmt in ("%Y-%m-%d %H:%M", "%H:%M"):
+            try:
+                deadline = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            if fmt == "%H:%M":
+                deadline = datetime.combine(date.today(), deadline.time())
+            return deadline.timestamp(), None
+
+        return None, "Use HH:MM or YYYY-MM-DD HH:MM for the deadline."
+
     def add_task(self):
         task = self.new_task_input.text().strip()
-        success = self.task_manager.add_task(task)
+        deadline, error = self.parse_deadline(self.task_deadline_input.text().strip())
+        if error:
+            QMessageBox.warning(self, "Invalid Deadline", error)
+            return
+
+        success = self.task_manager.add_task(
+            task,
+            pomodoros=self.task_estimate_input.value(),
+            priority=TaskManager.PRIORITIES[self.task_priority_selector.currentText()],
+            deadline=deadline,
+        )
 
         if success:
             self.new_task_input.clear()
+            self.task_deadline_input.clear()
             self.update_task_list()
 
             # If no current task is set, use this task
@@ -540,6 +842,8 @@ class AITimer(QMainWindow):
 
     def update_task_list(self):
         task_text = self.task_manager.get_task_list_text()
+        if self.task_manager.tasks:
+            task_text += "\n" + self.task_scheduler.get_plan_text()
         self.task_list.setText(task_text)
 
     def generate_tasks_with_ai(self):
@@ -571,16 +875,114 @@ class AITimer(QMainWindow):
         else:
             QMessageBox.warning(self, "Error", error)
 
+    def set_transfer_buttons_enabled(self, enabled):
+        for button in (
+            self.import_tasks_btn,
+            self.export_tasks_btn,
+            self.import_history_btn,
+            self.export_history_btn,
+        ):
+            button.setEnabled(enabled)
+
+    def start_transfer(self, target, args):
+        self.set_transfer_buttons_enabled(False)
+        self.transfer_progress_bar.setValue(0)
+        self.transfer_progress_bar.show()
+        self.transfer_thread = threading.Thread(target=target, args=args, daemon=True)
+        self.transfer_thread.start()
+
+    def import_data(self, kind):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import", "", "Data files (*.csv *.jsonl);;All files (*)"
+        )
+        if path:
+            self.start_transfer(self.run_import, (kind, path))
+
+    def export_data(self, kind):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export", f"{kind}.csv", "CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if path:
+            self.start_transfer(self.run_export, (kind, path))
+
+    def run_import(self, kind, path):
+        # Parsing happens here; each batch is applied on the UI thread in one go
+        parse_record = (
+            DataTransfer.parse_task if kind == "tasks" else DataTransfer.parse_session
+        )
+        imported = 0
+        skipped = 0
+        try:
+            for batch, progress, skipped in DataTransfer.iter_batches(path, parse_record):
+                if batch:
+                    self.transfer_batch_ready.emit(kind, batch)
+                    imported += len(batch)
+                self.transfer_progress.emit(int(progress * 100))
+        except Exception as e:
+            self.transfer_finished.emit(f"Import failed after {imported} rows: {str(e)}")
+            return
+
+        self.transfer_finished.emit(f"Imported {imported} rows ({skipped} skipped).")
+
+    def run_export(self, kind, path):
+        if kind == "tasks":
+            total = len(self.task_manager.tasks)
+            export = lambda progress: DataTransfer.export_tasks(
+                path, self.task_manager, progress
+            )
+        else:
+            total = len(self.stats_manager.session_history) + self.session_archive.rows
+            export = lambda progress: DataTransfer.export_sessions(
+                path, self.stats_manager, progress, self.session_archive
+            )
+
+        try:
+            count = export(
+                lambda done: self.transfer_progress.emit(done * 100 // max(total, 1))
+            )
+        except Exception as e:
+            self.transfer_finished.emit(f"Export failed: {str(e)}")
+            return
+
+        self.transfer_finished.emit(f"Exported {count} rows to {path}.")
+
+    def apply_import_batch(self, kind, batch):
+        if kind == "tasks":
+            self.task_manager.add_tasks(batch)
+            # Index each batch as it lands so the final replan stays cheap
+            self.task_scheduler.update_index()
+        else:
+            self.stats_manager.add_sessions(batch)
+
+    def finish_transfer(self, message):
+        self.transfer_thread = None
+        self.transfer_progress_bar.hide()
+        self.set_transfer_buttons_enabled(True)
+        self.update_task_list()
+        self.update_stats_display()
+        self.save_settings()
+        self.statusBar().showMessage(message, 10000)
+
     def update_stats_display(self):
         stats_text = self.stats_manager.get_stats_text(self.task_manager.current_task)
+        period = ProductivityAnalytics.PERIODS[self.report_period_selector.currentIndex()]
+        stats_text += "\n" + self.analytics.get_report_text(period)
         self.stats_display.setText(stats_text)
+        # Only sessions added since the last refresh are counted and painted
+        self.stats_charts.refresh()
 
     def get_ai_insights(self):
         if not self.ai_assistant.is_api_key_valid:
             return
 
+        # Shares one batched report with "Analyze My Productivity"
         insights, error = self.ai_assistant.get_productivity_insights(
-            self.stats_manager.daily_stats
+            self.stats_manager.daily_stats,
+            self.task_manager.current_task,
+            self.task_manager.tasks,
+            history_summary=self.analytics.get_report_text("week"),
+            task_details=self.task_manager.task_details,
+            tasks_version=self.task_manager.version,
         )
 
         if insights:
@@ -593,19 +995,129 @@ class AITimer(QMainWindow):
         else:
             QMessageBox.warning(self, "Error", error)
 
+    def on_tab_changed(self, index):
+        # Panels that are expensive or change often refresh only when opened
+        if self.tabs.widget(index) is self.usage_tab:
+            self.update_usage_display()
+        elif self.tabs.widget(index) is self.history_tab:
+            self.update_history_display()
+
+    def format_suggestions(self, records):
+        return "".join(f"[{record.time}]\n{record.suggestion}\n\n" for record in records)
+
+    def update_history_display(self):
+        # Recent suggestions come from memory; older pages are read lazily
+        self.history_before = None
+        self.history_display.setText(
+            self.format_suggestions(self.ai_assistant.ai_suggestions.get_recent())
+        )
+        self.load_older_btn.setEnabled(True)
+
+    def load_older_suggestions(self):
+        records, self.history_before = self.ai_assistant.ai_suggestions.read_older(
+            self.history_before
+        )
+        self.history_display.append(self.format_suggestions(records))
+        if self.history_before == 0:
+            self.load_older_btn.setEnabled(False)
+
+    def update_usage_display(self):
+        self.usage_display.setText(
+            self.ai_assistant.usage.get_usage_text()
+            + "\n"
+            + self.ai_assistant.router.get_status_text()
+        )
+
+    def update_token_budget(self):
+        try:
+            budget = int(self.token_budget_input.text())
+        except ValueError:
+            budget = -1
+
+        if budget < 0:
+            QMessageBox.warning(
+                self, "Invalid Budget", "Token budget must be a whole number."
+            )
+            self.token_budget_input.setText(
+                str(self.ai_assistant.usage.daily_token_budget)
+            )
+            return
+
+        self.ai_assistant.usage.daily_token_budget = budget
+        self.update_usage_display()
+
+    def export_usage_metrics(self):
+        if self.ai_assistant.usage.export_prometheus():
+            QMessageBox.information(
+                self, "Metrics Exported", "Usage metrics written to ai_usage_metrics.prom"
+            )
+        else:
+            QMessageBox.warning(self, "Error", "Could not export usage metrics.")
+
+    @profiled("AITimer.save_settings")
     def save_settings(self):
         # Update model data from UI
-        self.timer_model.work_time = self.work_time_input.text()
-        self.timer_model.break_time = self.break_time_input.text()
+        self.timer_model.set_custom_times(
+            self.work_time_input.text(), self.break_time_input.text()
+        )
         self.timer_model.mode_index = self.mode_selector.currentIndex()
 
+        # Keep only recent history in the settings file
+        self.stats_manager.compact_history(self.session_archive)
+
         SettingsManager.save_settings(
             self.timer_model, self.task_manager, self.stats_manager, self.ai_assistant
         )
+        self.data_journal.save()
+
+        # Keep the machine-readable metrics file current for scrapers
+        self.ai_assistant.usage.export_prometheus()
+
+        if self.sync_client:
+            # The sync state may only claim what is already on disk
+            self.data_journal.flush()
+            self.sync_client.save_state()
+            self.start_sync()
+
+    def start_sync(self):
+        if self.sync_thread and self.sync_thread.is_alive():
+            return
+
+        self.sync_thread = threading.Thread(target=self.run_sync, daemon=True)
+        self.sync_thread.start()
+
+    def run_sync(self):
+        # Only unacknowledged local ops go up and only unseen remote ops come
+        # back, so each round trip costs O(changes)
+        try:
+            ops = self.sync_client.exchange()
+        except Exception as e:
+            print(f"Sync failed: {str(e)}")
+            return
+
+        if ops:
+            self.sync_ops_ready.emit(ops)
+
+    def apply_sync_ops(self, ops):
+        self.sync_client.apply(ops)
+        # The merged data goes to disk before the vector clock that marks it
+        # applied; otherwise a crash in between would lose it for good, as
+        # the server never sends those ops again
+        SettingsManager.save_settings(
+            self.timer_model, self.task_manager, self.stats_manager, self.ai_assistant
+        )
+        self.data_journal.save()
+        self.data_journal.flush()
+        self.sync_client.save_state()
+        self.update_task_list()
+        self.update_stats_display()
 
     def load_settings(self):
         settings = SettingsManager.load_settings()
         if not settings:
+            self.data_journal.load()
+            self.update_task_list()
+            self.update_stats_display()
             return
 
         # Load settings into models
@@ -613,6 +1125,7 @@ class AITimer(QMainWindow):
         self.task_manager.load_from_settings(settings)
         self.stats_manager.load_from_settings(settings)
         self.ai_assistant.load_from_settings(settings)
+        self.data_journal.load()
 
         # Update UI from models
         self.api_key_input.setText(self.ai_assistant.api_key)
@@ -622,21 +1135,77 @@ class AITimer(QMainWindow):
 
         self.work_time_input.setText(self.timer_model.work_time)
         self.break_time_input.setText(self.timer_model.break_time)
+
+        # Saved settings may add user-defined session plans
+        self.mode_selector.clear()
+        self.mode_selector.addItems(self.timer_model.plan_registry.names())
         self.mode_selector.setCurrentIndex(self.timer_model.mode_index)
+        self.token_budget_input.setText(
+            str(self.ai_assistant.usage.daily_token_budget)
+        )
 
         # Update displays
         self.update_task_list()
         self.update_stats_display()
         self.update_time_display_for_next_timer()
 
-    def closeEvent(self, event):
+    def restore_session(self):
+        state = self.checkpoint.load()
+        if not state or not state["timer_active"]:
+            return
+
+        self.mode_selector.setCurrentIndex(state["mode_index"])
+        self.timer_model.mode_index = self.mode_selector.currentIndex()
+        self.timer_model.select_plan(self.mode_selector.currentText())
+        self.timer_model.restore_session(state)
+        # Credit the finished session to the task it was started for
+        self.task_manager.current_task = state["current_task"]
+        self.task_input.setText(state["current_task"])
+
+        # Update UI to match the restored session
+        self.mode_label.setText(f"{self.timer_model.current_mode} Mode")
+        self.mode_label.setStyleSheet(
+            f"color: {'green' if self.timer_model.current_mode == 'Break' else 'red'};"
+        )
+        self.update_time_display()
+        self.progress_bar.setMaximum(self.timer_model.session_duration)
+        self.progress_bar.setValue(self.timer_model.remaining_time)
+        self.start_button.setText("Reset")
+        self.pause_button.setEnabled(True)
+        self.skip_button.setEnabled(True)
+
+        if self.timer_model.timer_paused:
+            self.pause_button.setText("Resume")
+        elif self.timer_model.remaining_time <= 0:
+            # The session ended while the app was closed
+            self.timer_complete()
+        else:
+            self.start_countdown()
+
+    def shutdown(self):
+        # Runs from closeEvent and again from aboutToQuit, since quitting
+        # from the tray skips closeEvent; only the first call does the work
+        if self.is_shut_down:
+            return
+        self.is_shut_down = True
+
         # Save settings before closing
         self.save_settings()
+        self.checkpoint.save(self.timer_model, self.task_manager.current_task)
+        self.checkpoint.close()
+        profiler.disable()
+        self.ai_assistant.ai_suggestions.flush()
+        self.ai_assistant.transport.close()
+        self.data_journal.close()
+
+    def closeEvent(self, event):
+        self.shutdown()
         event.accept()
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = AITimer()
+    app.aboutToQuit.connect(window.shutdown)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,79 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+from AIAssistant import AIAssistant
+from UsageTracker import BudgetExceededError
+
+
+class FakeClient:
+    # Stands in for openai.OpenAI; answers every completion with one text
+    def __init__(self, content):
+        self.requests = []
+        self.content = content
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.api_key = "key"
+
+    def create(self, timeout, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=SimpleNamespace(prompt_tokens=20, completion_tokens=10),
+        )
+
+
+def make_assistant(content):
+    assistant = AIAssistant()
+    client = FakeClient(content)
+    assistant.transport.get_client = lambda api_key, base_url=None: client
+    return assistant, client
+
+
+def test_spent_budget_blocks_calls_but_not_key_validation():
+    assistant, client = make_assistant("API key is valid")
+    assistant.usage.daily_token_budget = 100
+    assistant.usage.tokens_today = 100
+
+    assert assistant.validate_api_key("key", "openai")[0]
+    assert len(client.requests) == 1
+
+    suggestion, error = assistant.get_productivity_suggestion(
+        "write", {"pomodoros_completed": 1, "focus_time": 25}
+    )
+    assert suggestion is None
+    assert "budget" in error
+    assert len(client.requests) == 1
+
+    with pytest.raises(BudgetExceededError):
+        assistant._create_completion(
+            "test", [{"role": "user", "content": "hi"}], max_tokens=10
+        )
+
+
+def test_report_cache_is_keyed_on_the_task_list_version():
+    report = '{"suggestion": "s", "analysis": "a", "insights": "i"}'
+    assistant, client = make_assistant("API key is valid")
+    assert assistant.validate_api_key("key", "openai")[0]
+    client.content = report
+    stats = {"focus_time": 50, "pomodoros_completed": 2, "tasks_completed": 1}
+    tasks = ["write", "review"]
+
+    assert assistant.analyze_productivity(stats, "write", tasks, tasks_version=4) == (
+        "a",
+        None,
+    )
+    assert assistant.get_productivity_insights(
+        stats, "write", tasks, tasks_version=4
+    ) == ("i", None)
+    assert len(client.requests) == 2
+
+    # A changed task list means a new version, even for the same list object
+    assistant.analyze_productivity(stats, "write", tasks, tasks_version=5)
+    assert len(client.requests) == 3
@@ -0,0 +1,140 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("openai")
+
+from AIResilience import AIResilience, CircuitBreaker, CircuitOpenError
+from RequestCoalescer import RequestCancelledError
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = None
+        if retry_after is not None:
+            self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+def make_func(outcomes):
+    # Raises or returns each outcome in turn, recording every attempt
+    calls = []
+
+    def func(timeout, **kwargs):
+        calls.append(kwargs)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return func, calls
+
+
+def test_breaker_state_changes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.seconds_until_retry() > 0
+
+    # Once the timeout passes, exactly one probe goes through
+    breaker.open_until = 0.0
+    assert breaker.allow_request()
+    assert breaker.state == "half_open"
+    assert not breaker.allow_request()
+
+    # A failed probe opens the circuit again straight away
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.open_until = 0.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failure_count == 0
+
+
+def test_one_failure_per_logical_call():
+    resilience = AIResilience(max_retries=2, base_delay=0)
+    func, calls = make_func([StatusError(503)])
+
+    with pytest.raises(StatusError):
+        resilience.call(func)
+    assert len(calls) == 3
+    assert resilience.breaker.failure_count == 1
+    assert resilience.breaker.state == "closed"
+
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            resilience.call(func)
+    assert resilience.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        resilience.call(func)
+    assert len(calls) == 9
+
+
+def test_retry_then_success_keeps_circuit_closed():
+    resilience = AIResilience(max_retries=2, base_delay=0)
+    func, calls = make_func([StatusError(502), "ok"])
+
+    assert resilience.call(func, model="m") == "ok"
+    assert calls == [{"model": "m"}, {"model": "m"}]
+    assert resilience.breaker.failure_count == 0
+
+
+def test_client_errors_are_not_retried():
+    resilience = AIResilience(max_retries=2, base_delay=0)
+    func, calls = make_func([StatusError(401)])
+
+    with pytest.raises(StatusError):
+        resilience.call(func)
+    assert len(calls) == 1
+    assert resilience.breaker.state == "closed"
+
+
+def test_retry_after_is_honored_in_full():
+    resilience = AIResilience(max_delay=8.0)
+    assert resilience.get_retry_after(StatusError(429, "30")) == 30.0
+    assert resilience.get_retry_delay(StatusError(429, "30"), 0) == 30.0
+    assert resilience.get_retry_after(StatusError(429, "soon")) is None
+    assert resilience.get_retry_after(StatusError(503)) is None
+    assert 0 <= resilience.get_retry_delay(StatusError(503), 10) <= 8.0
+
+    # Waiting 30s would overrun the deadline, so the call gives up and keeps
+    # everyone else away until the server's time
+    func, calls = make_func([StatusError(429, "30")])
+    with pytest.raises(StatusError):
+        resilience.call(func)
+    assert len(calls) == 1
+    assert resilience.breaker.state == "open"
+    assert 28 <= resilience.breaker.seconds_until_retry() <= 30
+
+
+def test_cancelled_probe_frees_its_slot():
+    resilience = AIResilience(max_retries=2, base_delay=0)
+    resilience.breaker.state = "open"
+    func, calls = make_func([StatusError(503)])
+    checks = []
+
+    def before_attempt():
+        checks.append(None)
+        if len(checks) > 1:
+            raise RequestCancelledError()
+
+    with pytest.raises(RequestCancelledError):
+        resilience.call(func, before_attempt=before_attempt)
+    assert len(calls) == 1
+
+    # The next caller can probe instead of waiting on a probe that is gone
+    assert resilience.breaker.state == "open"
+    assert resilience.breaker.allow_request()
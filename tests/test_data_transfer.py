@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from DataTransfer import DataTransfer
+from TaskManager import TaskManager
+
+
+def import_tasks(path, task_manager, batch_size=2):
+    skipped = 0
+    for batch, _, skipped in DataTransfer.iter_batches(
+        str(path), DataTransfer.parse_task, batch_size
+    ):
+        task_manager.add_tasks(batch)
+    return skipped
+
+
+def test_malformed_lines_are_skipped(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(
+        '{"task": "a"}\n'
+        '{"task": "b", "pomodoros": 2}\n'
+        '{"task": "c", \n'
+        "[1, 2]\n"
+        '{"task": ""}\n'
+        '{"task": "d", "priority": 3}\n',
+        encoding="utf-8",
+    )
+
+    task_manager = TaskManager()
+    assert import_tasks(path, task_manager) == 3
+    assert task_manager.tasks == ["a", "b", "d"]
+    assert task_manager.get_details("b")["pomodoros"] == 2
+    assert task_manager.get_details("d")["priority"] == 3
+
+
+def test_task_round_trip_keeps_progress(tmp_path):
+    source = TaskManager()
+    source.add_task("write", 3, 3, 1700000000.0)
+    source.add_task("review")
+    source.record_pomodoro("write")
+    source.record_pomodoro("write")
+
+    for name in ("tasks.csv", "tasks.jsonl"):
+        path = tmp_path / name
+        assert DataTransfer.export_tasks(str(path), source) == 2
+
+        target = TaskManager()
+        assert import_tasks(path, target) == 0
+        assert list(target.iter_tasks()) == list(source.iter_tasks())
@@ -0,0 +1,65 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PromptBuilder import PromptBuilder
+from TaskManager import TaskManager
+
+
+def test_ranking_puts_current_and_urgent_tasks_first():
+    task_manager = TaskManager()
+    task_manager.add_task("old low", priority=1)
+    task_manager.add_task("old medium")
+    task_manager.add_task("due", deadline=1700000000.0)
+    task_manager.add_task("new medium")
+    task_manager.add_task("current", priority=1)
+
+    ranked = PromptBuilder().rank_tasks(
+        task_manager.tasks, "current", task_manager.task_details
+    )
+    assert ranked == ["current", "due", "new medium", "old medium", "old low"]
+
+
+def test_large_backlog_is_cut_to_the_budget():
+    task_manager = TaskManager()
+    for i in range(1000):
+        task_manager.add_task(f"task {i} " + "x" * 200, priority=3 if i % 10 == 0 else 2)
+
+    builder = PromptBuilder(task_token_budget=400)
+    text, tokens = builder.build_task_text(
+        task_manager.tasks, "", task_manager.task_details, task_manager.version
+    )
+    assert tokens <= 400
+    lines = text.split("\n")
+    assert all(len(line) <= 2 + PromptBuilder.MAX_TASK_CHARS for line in lines[:-1])
+    assert lines[-1].startswith(f"- ...and {1000 - (len(lines) - 1)} more tasks")
+    # High priority tasks are listed before any medium one is
+    listed = [int(line.split()[2]) for line in lines[:-1]]
+    assert all(i % 10 == 0 for i in listed)
+
+
+def test_cache_is_keyed_on_the_task_list_version():
+    task_manager = TaskManager()
+    task_manager.add_task("a")
+    task_manager.add_task("b")
+    builder = PromptBuilder()
+
+    def build():
+        return builder.build_task_text(
+            task_manager.tasks, "", task_manager.task_details, task_manager.version
+        )
+
+    first = build()
+    assert first[0] == "- b\n- a"
+    assert build() is first
+
+    # Same tasks in the same list, but the version moves on
+    task_manager.defer_task("a")
+    second = build()
+    assert second is not first
+    assert second[0] == "- a\n- b"
+
+    # Without a version the task list itself is the key
+    third = builder.build_task_text(["b", "a"], "", task_manager.task_details)
+    assert builder.build_task_text(["b", "a"], "", task_manager.task_details) is third
@@ -0,0 +1,143 @@
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("openai")
+
+from AIResilience import AIResilience, CircuitOpenError
+from ProviderRouter import ProviderRouter
+
+
+class StatusError(Exception):
+    status_code = 503
+    response = None
+
+
+class FakeClient:
+    # Stands in for openai.OpenAI: answers with its name after a delay, or fails
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, timeout, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise StatusError()
+        return self.name
+
+
+def make_router(*clients):
+    router = ProviderRouter(smoothing=0.5, default_hedge_delay=0.05)
+    for client in clients:
+        router.set_provider(
+            client.name, "model", client, AIResilience(max_retries=0, base_delay=0)
+        )
+    return router
+
+
+def get_provider(router, name):
+    return next(p for p in router.providers if p.name == name)
+
+
+def test_moving_averages():
+    router = make_router(FakeClient("a"))
+    provider = get_provider(router, "a")
+
+    router.record_success(provider, 1.0)
+    assert provider.latency == 1.0
+    router.record_success(provider, 3.0)
+    assert provider.latency == 2.0
+
+    router.record_failure(provider)
+    assert provider.error_rate == 0.5
+    router.record_success(provider, 2.0)
+    assert provider.error_rate == 0.25
+    assert provider.get_score() == pytest.approx(2.0 * 2.0)
+
+
+def test_ranking_prefers_untried_then_fastest_then_healthy():
+    router = make_router(FakeClient("slow"), FakeClient("fast"), FakeClient("new"))
+    router.record_success(get_provider(router, "slow"), 2.0)
+    router.record_success(get_provider(router, "fast"), 0.5)
+    assert [p.name for p in router.get_ranked()] == ["new", "fast", "slow"]
+
+    router.record_success(get_provider(router, "new"), 1.0)
+    get_provider(router, "fast").resilience.breaker.hold_open(60)
+    assert [p.name for p in router.get_ranked()] == ["new", "slow", "fast"]
+
+
+def test_call_fails_over_and_learns():
+    broken = FakeClient("broken", fail=True)
+    router = make_router(broken, FakeClient("backup"))
+
+    assert router.call(messages=[]) == "backup"
+    assert broken.calls == 1
+    assert get_provider(router, "broken").error_rate == 0.5
+    assert get_provider(router, "backup").latency is not None
+    # The failing provider now ranks behind the one that answered
+    assert router.get_ranked()[0].name == "backup"
+
+    with pytest.raises(CircuitOpenError):
+        ProviderRouter().call(messages=[])
+
+
+def test_hedge_delay_is_the_p95_latency():
+    router = make_router(FakeClient("a"))
+    provider = get_provider(router, "a")
+    for latency in (0.1, 0.2, 0.3):
+        router.record_success(provider, latency)
+    assert router.get_hedge_delay(provider) == 0.05
+
+    provider.recent_latencies.clear()
+    for i in range(20):
+        router.record_success(provider, i / 10)
+    assert router.get_hedge_delay(provider) == pytest.approx(1.8)
+
+
+def test_hedged_call_takes_the_first_answer_and_reports_the_other():
+    slow = FakeClient("slow", delay=0.5)
+    fast = FakeClient("fast")
+    router = make_router(slow, fast)
+    router.record_success(get_provider(router, "slow"), 0.01)
+    router.record_success(get_provider(router, "fast"), 0.02)
+
+    extra = []
+    done = threading.Event()
+
+    def record_extra(response, latency):
+        extra.append(response)
+        done.set()
+
+    assert router.call_hedged(messages=[], record_extra=record_extra) == "fast"
+    # The slower request is still billed, so it is reported once it lands
+    assert done.wait(5)
+    assert extra == ["slow"]
+
+
+def test_hedge_is_not_sent_when_the_first_answer_is_quick():
+    first = FakeClient("first")
+    second = FakeClient("second")
+    router = make_router(first, second)
+    router.record_success(get_provider(router, "first"), 0.01)
+    router.record_success(get_provider(router, "second"), 0.02)
+
+    assert router.call_hedged(messages=[], record_extra=lambda *args: None) == "first"
+    assert second.calls == 0
+
+
+def test_hedged_call_survives_one_failure():
+    router = make_router(FakeClient("broken", fail=True), FakeClient("backup"))
+    router.record_success(get_provider(router, "broken"), 0.01)
+    router.record_success(get_provider(router, "backup"), 0.02)
+
+    assert router.call_hedged(messages=[]) == "backup"
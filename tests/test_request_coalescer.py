@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RequestCoalescer import RequestCancelledError, RequestCoalescer
+
+
+def run_in_threads(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_identical_requests_share_one_call():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(None)
+        started.set()
+        release.wait(5)
+        return "tip"
+
+    leader, leader_results, _ = run_in_threads(1, lambda: coalescer.run("tip", func))
+    started.wait(5)
+    followers, results, errors = run_in_threads(
+        4, lambda: coalescer.run("tip", func)
+    )
+    # Give the followers time to join the flight before it lands
+    time.sleep(0.2)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert leader_results == [("tip", False)]
+    assert errors == [None] * 4
+    assert results == [("tip", True)] * 4
+
+
+def test_different_keys_do_not_share():
+    coalescer = RequestCoalescer()
+    assert coalescer.run("a", lambda: 1) == (1, False)
+    assert coalescer.run("b", lambda: 2) == (2, False)
+    # Finished flights are not cached
+    assert coalescer.run("a", lambda: 3) == (3, False)
+
+
+def test_superseded_generation_is_cancelled():
+    coalescer = RequestCoalescer()
+    generation = coalescer.generation
+    assert coalescer.is_current(generation)
+    assert coalescer.is_current(None)
+
+    coalescer.next_generation()
+    assert not coalescer.is_current(generation)
+    with pytest.raises(RequestCancelledError):
+        coalescer.run("tip", lambda: "stale", generation=generation)
+    assert coalescer.run("tip", lambda: "fresh", generation=coalescer.generation) == (
+        "fresh",
+        False,
+    )
+
+
+def test_follower_retries_when_the_leader_is_cancelled():
+    coalescer = RequestCoalescer()
+    leader_started = threading.Event()
+    release = threading.Event()
+
+    def stale_call():
+        leader_started.set()
+        release.wait(5)
+        raise RequestCancelledError("superseded")
+
+    leader, _, leader_errors = run_in_threads(
+        1, lambda: coalescer.run("tip", stale_call)
+    )
+    leader_started.wait(5)
+    follower, results, errors = run_in_threads(
+        1, lambda: coalescer.run("tip", lambda: "fresh")
+    )
+    release.set()
+    leader[0].join(5)
+    follower[0].join(5)
+
+    assert isinstance(leader_errors[0], RequestCancelledError)
+    # Either it joined the cancelled flight and retried, or it came after it
+    assert errors == [None]
+    assert results[0][0] == "fresh"
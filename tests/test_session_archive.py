@@ -0,0 +1,31 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SessionArchive import SessionArchive
+from StatsManager import StatsManager
+
+
+def test_successive_compactions(tmp_path):
+    archive = SessionArchive(str(tmp_path / "archive"))
+    stats_manager = StatsManager()
+    day = 86400
+    now = 100 * day
+
+    stats_manager.add_sessions(
+        [[10 * day, 25, "Work", "a", 1], [90 * day, 25, "Work", "b", 1]]
+    )
+    assert stats_manager.compact_history(archive, now) == 1
+
+    stats_manager.add_sessions([[20 * day, 5, "Break", "", 1]])
+    assert stats_manager.compact_history(archive, now) == 1
+
+    assert archive.rows == 2
+    assert [record[3] for record in stats_manager.session_history] == ["b"]
+    with open(os.path.join(archive.path, "meta.json")) as f:
+        assert json.load(f)["sorted"] is True
+
+    reopened = SessionArchive(archive.path)
+    assert [session["task"] for session in reopened.iter_sessions()] == ["a", ""]
@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SessionCheckpoint import SessionCheckpoint
+from TimerModel import TimerModel
+
+
+def test_restore_non_default_mode(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path / "session.chk"))
+    timer_model = TimerModel()
+    names = timer_model.plan_registry.names()
+    mode = "Pomodoro Cycle (4x25/5, 15)"
+
+    # What AITimer.start_timer does for the selected mode
+    timer_model.mode_index = names.index(mode)
+    timer_model.start_timer(mode, timer_model.current_mode)
+    for _ in range(7):
+        timer_model.toggle_mode()
+    timer_model.start_timer(mode, timer_model.current_mode)
+    assert timer_model.remaining_time == 15 * 60
+
+    assert checkpoint.save(timer_model, "write report")
+    checkpoint.close()
+
+    state = SessionCheckpoint(checkpoint.path).load()
+    assert state["mode_index"] == names.index(mode)
+    assert state["current_task"] == "write report"
+
+    # What AITimer.restore_session does on the next start
+    restored = TimerModel()
+    restored.select_plan(restored.plan_registry.names()[state["mode_index"]])
+    restored.restore_session(state, now=state["deadline"] - 600)
+    assert restored.plan.name == mode
+    assert restored.schedule_position == 7
+    assert restored.current_mode == "Break"
+    assert restored.remaining_time == 600
+
+
+def test_rejects_corrupted_record(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path / "session.chk"))
+    timer_model = TimerModel()
+    timer_model.start_timer("Pomodoro (25/5)", "Work")
+    checkpoint.save(timer_model, "task")
+    checkpoint.close()
+
+    with open(checkpoint.path, "r+b") as f:
+        f.seek(10)
+        f.write(b"\xff")
+    assert checkpoint.load() is None
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SessionPlan import SessionPlan, SessionPlanRegistry
+from TimerModel import TimerModel
+
+
+def test_cycle_with_long_break():
+    plan = SessionPlan.cycle("cycle", 25, 5, 15, 4)
+    assert plan.modes == ("Work", "Break") * 4
+    assert plan.durations == (1500, 300) * 3 + (1500, 900)
+    assert plan.next_positions == (1, 2, 3, 4, 5, 6, 7, 0)
+    assert plan.first_position == {"Work": 0, "Break": 1}
+
+
+def test_position_for_mode():
+    plan = SessionPlan.cycle("cycle", 25, 5, 15, 2)
+    assert plan.position_for_mode(2, "Work") == 2
+    assert plan.position_for_mode(2, "Break") == 1
+    assert plan.position_for_mode(9, "Work") == 0
+
+
+@pytest.mark.parametrize("steps", [[], [("Work", 0)], [("Nap", 5)], [("Work", "x")]])
+def test_invalid_steps_are_rejected(steps):
+    with pytest.raises(ValueError):
+        SessionPlan("bad", steps)
+
+
+def test_custom_times_fall_back_when_invalid():
+    registry = SessionPlanRegistry()
+    names = registry.names()
+    assert registry.set_custom_times("40", "10") is None
+    assert registry.get("Custom").durations == (2400, 600)
+
+    assert registry.set_custom_times("forty", "10") == "Invalid Time"
+    assert registry.get("Custom") is None
+    # The slot stays so mode selector indexes do not shift
+    assert registry.names() == names
+
+    timer_model = TimerModel()
+    timer_model.set_custom_times("0", "5")
+    assert timer_model.start_timer("Custom", "Work") == (None, "Invalid Time")
+    assert timer_model.get_next_timer_duration("Custom") == 1500
+    assert timer_model.plan.name == "Pomodoro (25/5)"
+
+
+def test_timer_walks_the_plan():
+    timer_model = TimerModel()
+    timer_model.start_timer("Pomodoro Cycle (4x25/5, 15)", "Work")
+    durations = []
+    for _ in range(8):
+        durations.append(timer_model.remaining_time)
+        timer_model.skip_timer()
+        timer_model.start_timer("Pomodoro Cycle (4x25/5, 15)", timer_model.current_mode)
+    assert durations == [1500, 300] * 3 + [1500, 900]
+    assert timer_model.current_mode == "Work"
+
+    # Switching plans keeps the mode the timer is in
+    timer_model.toggle_mode()
+    timer_model.start_timer("Long Focus (50/10)", timer_model.current_mode)
+    assert timer_model.remaining_time == 600
+
+
+def test_user_plans_round_trip():
+    registry = SessionPlanRegistry()
+    registry.register(SessionPlan("Sprint", [("Work", 90), ("Break", 20)]))
+    plans = registry.get_user_plans()
+    assert plans == [{"name": "Sprint", "steps": [["Work", 90], ["Break", 20]]}]
+
+    restored = SessionPlanRegistry()
+    restored.load_user_plans(plans + [{"name": "Broken", "steps": [["Work", -1]]}])
+    assert restored.get("Sprint").durations == (5400, 1200)
+    assert restored.get("Broken") is None
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from HandlerProfiler import HandlerProfiler
+from StallWatchdog import StallWatchdog
+
+
+def test_late_tick_is_reported():
+    watchdog = StallWatchdog(expected_interval=1.0, threshold=0.5)
+    watchdog.tick()
+    assert watchdog.stall_count == 0
+
+    watchdog.arm()
+    watchdog.last_tick -= 1.2
+    watchdog.tick()
+    assert watchdog.stall_count == 0
+
+    watchdog.last_tick -= 3.0
+    watchdog.tick()
+    assert watchdog.stall_count == 1
+    assert watchdog.longest_stall >= 3.0
+
+    # Nothing is measured while the countdown is stopped
+    watchdog.disarm()
+    time.sleep(0.01)
+    watchdog.tick()
+    assert watchdog.stall_count == 1
+
+
+def blocking_handler():
+    time.sleep(0.5)
+
+
+def test_blocked_ui_thread_stack_is_captured():
+    watchdog = StallWatchdog(expected_interval=0.1, threshold=0.1, sample_interval=0.02)
+    watchdog.start()
+    watchdog.arm()
+    blocking_handler()
+
+    assert "blocking_handler" in watchdog.stall_stack
+    watchdog.tick()
+    assert watchdog.stall_count == 1
+    assert watchdog.stall_stack is None
+    watchdog.disarm()
+
+
+def test_profiled_handlers_are_timed_only_when_enabled(tmp_path):
+    profiler = HandlerProfiler()
+
+    @profiler.profiled("handler")
+    def handler(value):
+        return value * 2
+
+    assert handler(2) == 4
+    assert profiler.timings == {}
+
+    profiler.enable()
+    try:
+        assert handler(3) == 6
+        handler(4)
+        calls, total, longest = profiler.timings["handler"]
+        assert calls == 2
+        assert 0 <= longest <= total
+    finally:
+        profiler.disable(str(tmp_path / "profile.txt"))
+
+    assert not profiler.enabled
+    report = (tmp_path / "profile.txt").read_text()
+    assert "handler: 2 calls" in report
+    assert "UI thread profile" in report
@@ -0,0 +1,122 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from StatsManager import StatsManager
+from SyncClient import SyncClient
+from SyncServer import SyncServer
+from TaskManager import TaskManager
+
+
+def make_client(tmp_path, name, server):
+    client = SyncClient(
+        TaskManager(), StatsManager(), state_path=str(tmp_path / f"{name}.json")
+    )
+    client.transport = server
+    return client
+
+
+def sync_all(*clients):
+    # Two rounds so every client sees what the others pushed
+    for _ in range(2):
+        for client in clients:
+            client.apply(client.exchange())
+
+
+def get_tasks(client):
+    return sorted(
+        (task, client.task_manager.get_details(task)["done"])
+        for task in client.task_manager.tasks
+    )
+
+
+def test_concurrent_task_changes_converge(tmp_path):
+    server = SyncServer()
+    a = make_client(tmp_path, "a", server)
+    b = make_client(tmp_path, "b", server)
+
+    a.task_manager.add_task("write", 3)
+    a.task_manager.add_task("review")
+    a.task_manager.add_task("deploy")
+    sync_all(a, b)
+    assert get_tasks(b) == [("deploy", 0), ("review", 0), ("write", 0)]
+
+    # Concurrent: a removes "review" while b updates it; b adds a task while
+    # a records progress on another
+    a.task_manager.complete_task("review")
+    b.task_manager.record_pomodoro("review")
+    b.task_manager.add_task("test")
+    a.task_manager.record_pomodoro("write")
+    b.task_manager.defer_task("deploy")
+    sync_all(a, b)
+
+    assert get_tasks(a) == get_tasks(b) == [("deploy", 0), ("test", 0), ("write", 1)]
+    assert (
+        a.task_manager.get_details("deploy")["order"]
+        == b.task_manager.get_details("deploy")["order"]
+    )
+
+
+def test_concurrent_add_and_remove_latest_wins(tmp_path):
+    server = SyncServer()
+    a = make_client(tmp_path, "a", server)
+    b = make_client(tmp_path, "b", server)
+    a.task_manager.add_task("plan")
+    sync_all(a, b)
+
+    # b's re-add carries a later stamp than a's removal
+    a.task_manager.complete_task("plan")
+    b.task_manager.complete_task("plan")
+    b.task_manager.add_task("plan")
+    sync_all(a, b)
+
+    assert a.task_manager.tasks == b.task_manager.tasks == ["plan"]
+
+
+def test_stats_counters_converge(tmp_path):
+    server = SyncServer()
+    a = make_client(tmp_path, "a", server)
+    b = make_client(tmp_path, "b", server)
+
+    a.stats_manager.update_work_completed(25)
+    b.stats_manager.update_work_completed(50)
+    b.stats_manager.task_completed()
+    a.stats_manager.record_session(25, "Work", "write", ended_at=1000.0)
+    sync_all(a, b)
+
+    expected = {"focus_time": 75, "tasks_completed": 1, "pomodoros_completed": 2}
+    assert a.stats_manager.daily_stats == b.stats_manager.daily_stats == expected
+    assert b.stats_manager.session_history == [[1000.0, 25, "Work", "write", 1]]
+
+    # Nothing new: another round changes nothing
+    sync_all(a, b)
+    assert a.stats_manager.daily_stats == expected
+
+
+def test_restart_only_fetches_unseen_ops(tmp_path):
+    server = SyncServer()
+    a = make_client(tmp_path, "a", server)
+    b = make_client(tmp_path, "b", server)
+    a.task_manager.add_task("write")
+    sync_all(a, b)
+    b.save_state()
+
+    a.task_manager.add_task("review")
+    a.apply(a.exchange())
+
+    restarted = SyncClient(b.task_manager, b.stats_manager, state_path=b.state_path)
+    restarted.transport = server
+    ops = restarted.exchange()
+    assert [op["task"] for op in ops] == ["review"]
+
+
+def test_imported_progress_is_synced(tmp_path):
+    server = SyncServer()
+    a = make_client(tmp_path, "a", server)
+    b = make_client(tmp_path, "b", server)
+
+    a.task_manager.add_tasks([("write", 4, 2, None, 3), ("review", 1, 2, None, 0)])
+    sync_all(a, b)
+
+    assert get_tasks(b) == [("review", 0), ("write", 3)]
@@ -0,0 +1,104 @@
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from TaskManager import TaskManager
+from TaskScheduler import TaskScheduler
+from TimerModel import TimerModel
+
+# Four hours before midnight: eight 25/5 work slots
+NOW = datetime(2026, 1, 5, 20, 0)
+
+
+def make_scheduler():
+    task_manager = TaskManager()
+    return task_manager, TaskScheduler(task_manager, TimerModel())
+
+
+def planned_tasks(scheduler):
+    return [task for _, _, task, _ in scheduler.replan(NOW)]
+
+
+def test_work_slots_follow_the_plan():
+    _, scheduler = make_scheduler()
+    slots = scheduler.get_work_slots(NOW)
+    assert len(slots) == 8
+    assert all(minutes == 25 for _, minutes in slots)
+    assert (slots[1][0] - slots[0][0]).total_seconds() == 30 * 60
+
+
+def test_urgency_order():
+    task_manager, scheduler = make_scheduler()
+    soon = NOW.timestamp() + 3600
+    later = NOW.timestamp() + 7200
+    task_manager.add_task("low", priority=1)
+    task_manager.add_task("high", priority=3)
+    task_manager.add_task("later deadline", deadline=later)
+    task_manager.add_task("medium")
+    task_manager.add_task("soon deadline", priority=1, deadline=soon)
+
+    assert planned_tasks(scheduler) == [
+        "soon deadline",
+        "later deadline",
+        "high",
+        "medium",
+        "low",
+    ]
+
+
+def test_estimates_fill_slots_and_flag_missed_deadlines():
+    task_manager, scheduler = make_scheduler()
+    task_manager.add_task("report", pomodoros=3, deadline=NOW.timestamp() + 3600)
+    task_manager.add_task("email")
+
+    schedule = scheduler.replan(NOW)
+    assert [task for _, _, task, _ in schedule] == ["report"] * 3 + ["email"]
+    # The third slot ends after the deadline
+    assert [at_risk for _, _, _, at_risk in schedule] == [False, False, True, False]
+
+
+def test_replan_follows_task_changes():
+    task_manager, scheduler = make_scheduler()
+    for task in ("a", "b", "c"):
+        task_manager.add_task(task)
+    assert planned_tasks(scheduler) == ["a", "b", "c"]
+
+    task_manager.defer_task("a")
+    assert planned_tasks(scheduler) == ["b", "c", "a"]
+
+    assert task_manager.record_pomodoro("b")
+    assert planned_tasks(scheduler) == ["c", "a"]
+
+    task_manager.complete_task("c")
+    task_manager.add_task("d", priority=3)
+    assert planned_tasks(scheduler) == ["d", "a"]
+    assert scheduler.get_current_task() == "d"
+
+
+def test_incremental_index_matches_a_fresh_plan():
+    task_manager, scheduler = make_scheduler()
+    rng = random.Random(7)
+    task_manager.add_tasks(
+        [
+            (f"t{i}", rng.randint(1, 3), rng.randint(1, 3), None, 0)
+            for i in range(2000)
+        ]
+    )
+    scheduler.replan(NOW)
+
+    for _ in range(500):
+        task = f"t{rng.randrange(2000)}"
+        action = rng.random()
+        if action < 0.4:
+            task_manager.record_pomodoro(task)
+        elif action < 0.7:
+            task_manager.defer_task(task)
+        else:
+            task_manager.complete_task(task)
+        scheduler.replan(NOW)
+
+    fresh = TaskScheduler(task_manager, scheduler.timer_model)
+    assert scheduler.replan(NOW, force=True) == fresh.replan(NOW)
@@ -0,0 +1,60 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from UsageTracker import BudgetExceededError, UsageTracker
+
+
+def usage(prompt_tokens, completion_tokens):
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def test_no_budget_means_unlimited():
+    tracker = UsageTracker()
+    tracker.record_call("tip", 0.5, usage(10**6, 10**6))
+    tracker.check_budget(10**6)
+
+
+def test_budget_counts_estimate_and_spent_tokens():
+    tracker = UsageTracker(daily_token_budget=1000)
+    tracker.check_budget(1000)
+    with pytest.raises(BudgetExceededError):
+        tracker.check_budget(1001)
+
+    tracker.record_call("tip", 0.5, usage(600, 200))
+    assert tracker.tokens_today == 800
+    tracker.check_budget(200)
+    with pytest.raises(BudgetExceededError):
+        tracker.check_budget(201)
+
+
+def test_budget_resets_on_a_new_day():
+    tracker = UsageTracker(daily_token_budget=100)
+    tracker.load_from_settings(
+        {"daily_token_budget": 100, "token_usage": {"date": "2000-01-01", "tokens": 100}}
+    )
+    assert tracker.tokens_today == 0
+    tracker.check_budget(100)
+
+    tracker.tokens_today = 100
+    tracker.usage_date = "2000-01-02"
+    tracker.check_budget(100)
+    assert tracker.tokens_today == 0
+
+
+def test_errors_and_cache_hits_cost_no_tokens():
+    tracker = UsageTracker(daily_token_budget=100)
+    tracker.record_error("tip", 1.0)
+    tracker.record_cache_hit("tip")
+    tracker.record_estimate("tip", 50)
+    tracker.record_call("tip", 0.5, None)
+
+    assert tracker.tokens_today == 0
+    stats = tracker.methods["tip"]
+    assert (stats["calls"], stats["errors"], stats["cache_hits"]) == (1, 1, 1)
+    assert stats["estimated_prompt_tokens"] == 50
+    assert 'ai_request_errors_total{method="tip"} 1' in tracker.get_prometheus_text()